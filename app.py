@@ -1,56 +1,179 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify, session
+from flask import Blueprint, Flask, Response, abort, current_app, render_template, request, redirect, url_for, flash, send_file, send_from_directory, jsonify, session, stream_with_context
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash
+from werkzeug.local import LocalProxy
 from werkzeug.middleware.proxy_fix import ProxyFix
-import hashlib
+import hmac
 import json
 import pdfkit
 import os
 import base64
-from datetime import datetime
+import secrets
+import string
+from datetime import datetime, timedelta
 from functools import wraps
 from io import BytesIO
 import io
 import csv
+import logging
+import threading
+import time
+import zipfile
+
+import click
 
 from flask_mail import Mail, Message
+from sqlalchemy import and_, event, func, insert, or_
+from sqlalchemy.orm import joinedload, selectinload
 
 from config import Config
 from database import db, init_db, login_manager
 from blockchain import Blockchain
 from models import User, Certificate, VerificationLog
+from utils.hashing import get_stream_size, hash_stream, hash_file, hash_zip_members
+from utils.cache import TTLCache
+from utils.log_buffer import USER_AGENT_LENGTH, VerificationLogBuffer
+from utils.metrics import (CERTIFICATES_ISSUED, LEDGER_APPEND_LATENCY, LEDGER_HEIGHT, PDF_RENDER_LATENCY,
+                           init_metrics, record_verification, render_metrics)
+from utils.pagination import keyset_paginate
+from utils.profiler import RequestProfiler
+from utils.query_counter import init_query_counter
+from utils.stage_timing import init_stage_timing, stage_stats, timed
+from utils.structured_log import init_logging
+from utils.search import ensure_search_index, search_index_available, search_subquery
+from utils.rollups import get_rollup_watermark, get_top_certificates, get_verification_series, update_rollups
+from utils.stats import get_dashboard_stats, get_grade_distribution, record_issuance, record_verifications
+from utils.migrations import get_schema_version, run_migrations
+from utils.warmup import Warmup
+
+logger = logging.getLogger(__name__)
+
+# Extensions, caches and the log writer are bound to an app in create_app()
+mail = Mail()
+
+# Cache of assembled verification results, keyed by hash and cert_id
+verification_cache = TTLCache(max_entries=0)
+
+# Course facets and student counts for the admin listings, dropped on writes
+listing_cache = TTLCache(max_entries=0)
+
+# Verification logs are queued here and bulk-inserted off the request path
+log_buffer = VerificationLogBuffer()
+
+# Opt-in request profiling (PROFILE_SAMPLE_RATE); no request hooks when off
+profiler = RequestProfiler()
+
+# All routes; create_app() registers them on the app
+main = Blueprint('main', __name__)
+
+# The ledger is read from disk on first use, or once in the gunicorn master
+# before workers fork (see gunicorn.conf.py), never at import time
+_blockchain = None
+_blockchain_lock = threading.Lock()
+
+
+def get_blockchain(app=None, progress=None):
+    """Return the process-wide Blockchain, loading it on first call"""
+    global _blockchain
+    if _blockchain is None:
+        config = (app or current_app).config
+        with _blockchain_lock:
+            if _blockchain is None:
+                _blockchain = Blockchain(persist_file=config.get('BLOCKCHAIN_FILE'), progress=progress)
+    return _blockchain
+
+
+blockchain = LocalProxy(get_blockchain)
+
+
+def upgrade_schema():
+    """Create tables, apply pending schema migrations and build the full-text search index"""
+    applied = run_migrations(blockchain)
+    print(f"✓ Database schema at version {get_schema_version()}" + (f" (applied {applied})" if applied else ""))
+
+    # Full-text search index for the admin listings (kept in sync by the database)
+    if current_app.config['FULL_TEXT_SEARCH'] and ensure_search_index():
+        print("✓ Full-text search index ready")
+
+
+def bootstrap_admin(username='admin', email='admin@certificateverifier.com', password='admin123'):
+    """Create the admin account unless that username or email is taken; returns True if created"""
+    if User.query.filter((User.username == username) | (User.email == email)).first():
+        return False
+    admin = User(username=username, email=email, role='admin')
+    admin.set_password(password)
+    db.session.add(admin)
+    db.session.commit()
+    return True
+
+
+@event.listens_for(Certificate, 'after_insert')
+@event.listens_for(Certificate, 'after_update')
+@event.listens_for(Certificate, 'after_delete')
+def invalidate_cached_verification(mapper, connection, target):
+    """Drop cached results when a certificate is issued, revoked or deactivated"""
+    verification_cache.invalidate(target.blockchain_hash)
+    verification_cache.invalidate(('cert_id', target.cert_id) if target.cert_id else None)
+    listing_cache.invalidate('course_facets')
+
+
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_student_count(mapper, connection, target):
+    """Drop the cached student count when an account is created, changed or deleted"""
+    listing_cache.invalidate('student_count')
+
+
+def get_course_facets():
+    """[(course_name, certificate count)] for the certificate filter, cached until the next issuance"""
+    facets = listing_cache.get('course_facets')
+    if facets is None:
+        facets = db.session.query(Certificate.course_name, func.count(Certificate.id)) \
+            .group_by(Certificate.course_name) \
+            .order_by(Certificate.course_name).all()
+        facets = [(course, count) for course, count in facets]
+        listing_cache.set('course_facets', facets)
+    return facets
 
-# Initialize Flask app
-app = Flask(__name__)
-# Add ProxyFix for proper URL generation behind proxies (like Nginx/PythonAnywhere)
-app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
-app.config.from_object(Config)
-
-# Initialize Mail
-mail = Mail(app)
-
-# Initialize extensions
-init_db(app)
-
-# Initialize Database & Default Admin (Critical for first run on Railway)
-with app.app_context():
-    db.create_all()
-    # Check if admin exists
-    if not User.query.filter_by(username='admin').first():
-        print("Creating default admin user...")
-        admin = User(username='admin', email='admin@certificateverifier.com', role='admin')
-        admin.set_password('admin123')
-        db.session.add(admin)
-        db.session.commit()
-        print("✓ Default admin created: admin / admin123")
 
-# Initialize blockchain
-blockchain = Blockchain(persist_file=app.config.get('BLOCKCHAIN_FILE'))
+def get_student_count():
+    """Number of student accounts, cached until an account changes"""
+    count = listing_cache.get('student_count')
+    if count is None:
+        count = User.query.filter_by(role='student').count()
+        listing_cache.set('student_count', count)
+    return count
 
-# Ensure directories exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-os.makedirs(app.config['QR_FOLDER'], exist_ok=True)
+
+def warm_ledger(progress):
+    """Parse the ledger file (a no-op if it was loaded before the fork)"""
+    chain = get_blockchain(progress=progress).chain
+    LEDGER_HEIGHT.set(len(chain))
+    progress(len(chain), len(chain))
+
+
+def warm_ledger_index(progress):
+    """Build the hash and cert_id lookup indexes of the ledger"""
+    blockchain.build_index(progress=progress)
+
+
+def warm_caches(progress):
+    """Prime the admin listing caches and the search index check"""
+    get_course_facets()
+    get_student_count()
+    if current_app.config['FULL_TEXT_SEARCH']:
+        search_index_available()
+    progress(1, 1)
+
+
+# Readiness: /health stays 503 until every stage has run in this process
+warmup = Warmup(stages=[
+    ('ledger', warm_ledger),
+    ('ledger_index', warm_ledger_index),
+    ('caches', warm_caches),
+])
 
 
 # Decorators
@@ -61,7 +184,7 @@ def admin_required(f):
     def decorated_function(*args, **kwargs):
         if not current_user.is_admin():
             flash('Access denied. Admin privileges required.', 'error')
-            return redirect(url_for('student_dashboard'))
+            return redirect(url_for('main.student_dashboard'))
         return f(*args, **kwargs)
     return decorated_function
 
@@ -79,11 +202,195 @@ def get_base_url():
 
 
 
+def block_to_info(block):
+    """Convert a block to the dict shown on the verification pages"""
+    return {
+        'index': block.index,
+        'hash': block.hash,
+        'previous_hash': block.previous_hash,
+        'timestamp': block.timestamp.isoformat()
+    }
+
+
+def summarize_certificate(certificate):
+    """Build a session-independent summary of a certificate for verification results"""
+    if not certificate:
+        return None
+    try:
+        marksheet_data = certificate.get_marksheet_data()
+    except (TypeError, ValueError):
+        marksheet_data = {}
+    return {
+        'id': certificate.id,
+        'student_name': certificate.student_name,
+        'course_name': certificate.course_name,
+        'issue_date': certificate.issue_date,
+        'is_active': certificate.is_active,
+        'block_index': certificate.block_index,
+        'marksheet_data': marksheet_data
+    }
+
+
+def get_verification_by_hash(cert_hash):
+    """Resolve a certificate hash to its verification result (cached)"""
+    key = ('hash', cert_hash)
+    result = verification_cache.get(key)
+    if result is None:
+        block = blockchain.get_block_by_hash(cert_hash)
+        certificate = Certificate.query.filter_by(blockchain_hash=cert_hash).first()
+        result = {
+            'valid': block is not None,
+            'block_info': block_to_info(block) if block else None,
+            'certificate': summarize_certificate(certificate)
+        }
+        verification_cache.set(key, result, tags=[cert_hash])
+    return result
+
+
+def get_verification_by_cert_id(cert_id):
+    """Resolve a certificate ID to its issued hash, size, block and certificate (cached)"""
+    key = ('cert_id', cert_id)
+    result = verification_cache.get(key)
+    if result is None:
+        # Indexed lookup: the certificate row points straight at its block
+        certificate = Certificate.query.filter_by(cert_id=cert_id).first()
+        block = blockchain.get_block_by_index(certificate.block_index) if certificate else None
+        record = block.get_data() if block else None
+
+        if not record or record.get('cert_id') != cert_id:
+            # Legacy rows without cert_id (or a mismatched block): scan the chain
+            record = blockchain.get_record_by_cert_id(cert_id)
+            chain_hash = record.get('pdf_hash') if record else None
+            block = blockchain.get_block_by_hash(chain_hash) if chain_hash else None
+            certificate = Certificate.query.filter_by(blockchain_hash=chain_hash).first() if chain_hash else None
+
+        chain_hash = record.get('pdf_hash') if record else None
+        result = {
+            'chain_hash': chain_hash,
+            'expected_size': record.get('pdf_size') if record else None,
+            'block_info': block_to_info(block) if block else None,
+            'certificate': summarize_certificate(certificate)
+        }
+        verification_cache.set(key, result, tags=[chain_hash] if chain_hash else [])
+    return result
+
+
+def build_batch_result(kind, query, status, pdf_hash, block, certificate):
+    """Build one NDJSON line of a batch verification response"""
+    return {
+        'type': kind,
+        'query': query,
+        'status': status,
+        'valid': status == 'Valid',
+        'pdf_hash': pdf_hash,
+        'block': {
+            'index': block.index,
+            'hash': block.hash,
+            'timestamp': block.timestamp.isoformat()
+        } if block else None,
+        'certificate': {
+            'student_name': certificate.student_name,
+            'course_name': certificate.course_name,
+            'issue_date': certificate.issue_date.isoformat()
+        } if certificate else None
+    }
+
+
+def load_certificates_by_hash(pdf_hashes, chunk_size=500):
+    """Fetch certificates for many hashes with one IN query per chunk_size hashes"""
+    pdf_hashes = sorted({h for h in pdf_hashes if h})
+    certificates = {}
+    for start in range(0, len(pdf_hashes), chunk_size):
+        chunk = pdf_hashes[start:start + chunk_size]
+        for cert in Certificate.query.filter(Certificate.blockchain_hash.in_(chunk)):
+            certificates[cert.blockchain_hash] = cert
+    return certificates
+
+
+def split_batch_items(items):
+    """
+    Classify a bare JSON list of a batch request: 64 hex characters is a
+    certificate hash, anything else a cert_id. Returns (hashes, cert_ids).
+    """
+    hashes, cert_ids = [], []
+    for item in items:
+        item = item.strip()
+        if len(item) == 64 and all(c in string.hexdigits for c in item):
+            hashes.append(item)
+        elif item:
+            cert_ids.append(item)
+    return hashes, cert_ids
+
+
+def verify_id_batch(hashes, cert_ids):
+    """Verify lists of hashes and cert_ids; yields (result, log_row) per item"""
+    blocks_by_hash, records_by_cert_id = blockchain.find_blocks(hashes=hashes, cert_ids=cert_ids)
+    certificates = load_certificates_by_hash(
+        set(blocks_by_hash) | {record.get('pdf_hash') for _, record in records_by_cert_id.values()}
+    )
+
+    for cert_hash in hashes:
+        block = blocks_by_hash.get(cert_hash)
+        certificate = certificates.get(cert_hash)
+        status = 'Valid' if block else 'Invalid'
+        yield (build_batch_result('hash', cert_hash, status, cert_hash, block, certificate),
+               {'certificate_id': certificate.id if certificate else None,
+                'blockchain_hash': cert_hash, 'status': status})
+
+    for cert_id in cert_ids:
+        block, record = records_by_cert_id.get(cert_id, (None, {}))
+        pdf_hash = record.get('pdf_hash')
+        certificate = certificates.get(pdf_hash)
+        status = 'Valid' if block else 'Invalid'
+        yield (build_batch_result('cert_id', cert_id, status, pdf_hash, block, certificate),
+               {'certificate_id': certificate.id if certificate else None,
+                'blockchain_hash': pdf_hash or cert_id, 'status': status})
+
+
+def verify_pdf_batch(archive, members):
+    """
+    Verify PDFs from a ZIP archive; yields (result, log_row) per file as its
+    hash completes. A file named <cert_id>.pdf is compared against that
+    certificate's issued hash (Valid/Tampered); any other file is looked up
+    by its hash (Valid/Invalid).
+    """
+    # Resolve the cert_ids in the file names before hashing starts
+    names = {member.filename: os.path.splitext(os.path.basename(member.filename))[0] for member in members}
+    _, records_by_cert_id = blockchain.find_blocks(cert_ids=names.values())
+    certificates = load_certificates_by_hash(record.get('pdf_hash') for _, record in records_by_cert_id.values())
+
+    for member, hash_info, error in hash_zip_members(archive, members,
+                                                     chunk_size=current_app.config['HASH_CHUNK_SIZE'],
+                                                     max_workers=current_app.config['BATCH_VERIFY_WORKERS']):
+        if error:
+            yield {'type': 'pdf', 'query': member.filename, 'status': 'Error', 'valid': False, 'error': error}, None
+            continue
+
+        uploaded_hash = hash_info['hash']
+        cert_id = names[member.filename]
+        if cert_id in records_by_cert_id:
+            block, record = records_by_cert_id[cert_id]
+            chain_hash = record.get('pdf_hash')
+            status = 'Valid' if uploaded_hash == chain_hash else 'Tampered'
+            certificate = certificates.get(chain_hash)
+        else:
+            block = blockchain.get_block_by_hash(uploaded_hash)
+            status = 'Valid' if block else 'Invalid'
+            # Only a ledger hit can have a certificate row (one indexed lookup)
+            certificate = Certificate.query.filter_by(blockchain_hash=uploaded_hash).first() if block else None
+
+        yield (build_batch_result('pdf', member.filename, status, uploaded_hash,
+                                  block if status == 'Valid' else None, certificate),
+               {'certificate_id': certificate.id if certificate else None,
+                'blockchain_hash': uploaded_hash, 'status': status})
+
+
 def send_certificate_email(student_email, student_name, certificate):
     """Send email with certificate attachment"""
     try:
-        if not app.config.get('MAIL_USERNAME'):
-            print(f"📧 Mock Email to {student_email}: Certificate Issued (ID: {certificate.id})")
+        if not current_app.config.get('MAIL_USERNAME'):
+            logger.debug('Mail not configured; certificate email skipped', extra={
+                'event': 'email.skipped', 'recipient': student_email, 'certificate_id': certificate.id})
             return True
             
         subject = f"Certificate Issued - {certificate.course_name}"
@@ -96,47 +403,78 @@ def send_certificate_email(student_email, student_name, certificate):
             cert_id=certificate.id,
             date=certificate.issue_date.strftime('%B %d, %Y'),
             block_index=certificate.block_index,
-            verify_url=url_for('verify', _external=True, cert_id=certificate.id, hash=certificate.blockchain_hash),
+            verify_url=url_for('main.verify', _external=True, cert_id=certificate.id, hash=certificate.blockchain_hash),
             year=datetime.now().year
         )
         
         # Attach PDF
-        with app.open_resource(certificate.pdf_path) as fp:
+        with current_app.open_resource(certificate.pdf_path) as fp:
             msg.attach(f"{student_name}_Certificate.pdf", "application/pdf", fp.read())
             
         mail.send(msg)
         return True
     except Exception as e:
-        print(f"❌ Error sending email: {e}")
+        logger.warning('Sending the certificate email failed: %s', e, extra={
+            'event': 'email.failed', 'recipient': student_email, 'certificate_id': certificate.id})
         return False
 
 
 # Routes
-@app.route('/')
+@main.route('/')
 def index():
     """Redirect to login"""
     if current_user.is_authenticated:
         if current_user.is_admin():
-            return redirect(url_for('admin_dashboard'))
+            return redirect(url_for('main.admin_dashboard'))
         else:
-            return redirect(url_for('student_dashboard'))
-    return redirect(url_for('login'))
+            return redirect(url_for('main.student_dashboard'))
+    return redirect(url_for('main.login'))
+
 
+@main.route('/health/live')
+def health_live():
+    """Liveness probe: the process is up and serving requests"""
+    return {'status': 'alive', 'service': 'Certificate Tampering Detection'}, 200
 
-@app.route('/health')
+
+@main.route('/health')
+@main.route('/health/ready')
 def health():
-    """Health check endpoint for Render"""
-    return {'status': 'healthy', 'service': 'Certificate Tampering Detection'}, 200
+    """
+    Readiness probe (Render health check): 503 until the ledger, its lookup
+    indexes and the caches are warm. Starts the warm-up if nothing has yet.
+    """
+    warmup.start()
+    report = warmup.status()
+    report['status'] = 'healthy' if report['ready'] else report['state']
+    report['service'] = 'Certificate Tampering Detection'
+    return report, 200 if report['ready'] else 503
+
+
+@main.route('/metrics')
+def metrics():
+    """Prometheus metrics, merged across gunicorn workers (admins or METRICS_TOKEN bearer only)"""
+    if not current_app.config['METRICS_ENABLED']:
+        abort(404)
+    token = current_app.config.get('METRICS_TOKEN')
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    authorized = bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.strip().encode(), token.encode())
+    if not authorized and not (current_user.is_authenticated and current_user.is_admin()):
+        return jsonify({'error': 'Unauthorized'}), 403
+    if _blockchain is not None:
+        LEDGER_HEIGHT.set(len(_blockchain.chain))
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
 
 
-@app.route('/login', methods=['GET', 'POST'])
+@main.route('/login', methods=['GET', 'POST'])
 def login():
     """User login"""
     if current_user.is_authenticated:
         if current_user.is_admin():
-            return redirect(url_for('admin_dashboard'))
+            return redirect(url_for('main.admin_dashboard'))
         else:
-            return redirect(url_for('student_dashboard'))
+            return redirect(url_for('main.student_dashboard'))
 
     if request.method == 'POST':
         username = request.form.get('username')
@@ -155,88 +493,58 @@ def login():
             if next_page:
                 return redirect(next_page)
             if user.is_admin():
-                return redirect(url_for('admin_dashboard'))
+                return redirect(url_for('main.admin_dashboard'))
             else:
-                return redirect(url_for('student_dashboard'))
+                return redirect(url_for('main.student_dashboard'))
         else:
             flash('Invalid username or password.', 'error')
 
     return render_template('login.html')
 
 
-@app.route('/register')
+@main.route('/register')
 def register():
     """Registration disabled - only admins can create accounts"""
     flash('Registration is disabled. Please contact your administrator to create an account.', 'info')
-    return redirect(url_for('login'))
+    return redirect(url_for('main.login'))
 
 
-@app.route('/logout')
+@main.route('/logout')
 @login_required
 def logout():
     """User logout"""
     logout_user()
     flash('You have been logged out successfully.', 'info')
-    return redirect(url_for('login'))
+    return redirect(url_for('main.login'))
 
 
-@app.route('/admin/dashboard')
+@main.route('/admin/dashboard')
 @admin_required
 def admin_dashboard():
     """Admin dashboard with analytics"""
-    # Statistics
-    total_certificates = Certificate.query.count()
-    total_students = User.query.filter_by(role='student').count()
+    # Totals and chart data come from the materialized daily_stats table
+    stats = get_dashboard_stats(months=6)
+    total_students = get_student_count()
     recent_certificates = Certificate.query.order_by(Certificate.issue_date.desc()).limit(5).all()
-    recent_verifications = VerificationLog.query.order_by(VerificationLog.verified_at.desc()).limit(10).all()
+    recent_verifications = VerificationLog.query \
+        .options(joinedload(VerificationLog.certificate).load_only(Certificate.student_name, Certificate.course_name)) \
+        .order_by(VerificationLog.verified_at.desc()).limit(10).all()
 
-    # Blockchain info
+    # Blockchain info (only blocks added since the last check are re-validated)
     chain_info = blockchain.get_chain_info()
 
-    # Certificates by month (for chart - Last 6 months)
-    certificates_by_month = {}
-    
-    # improved chart data generation
-    end_date = datetime.now()
-    chart_labels = []
-    chart_data = []
-    
-    # Generate last 6 months buckets
-    for i in range(5, -1, -1):
-        # Calculate month and year
-        # Create a date object for the first day of the 'i'th month ago
-        if end_date.month - i > 0:
-            month = end_date.month - i
-            year = end_date.year
-        else:
-            month = (end_date.month - i) % 12
-            if month == 0: month = 12
-            year = end_date.year - 1 + ((end_date.month - i) // 12)
-            
-        month_label = f"{datetime(year, month, 1).strftime('%b %Y')}"
-        month_key = f"{year}-{month:02d}"
-        
-        chart_labels.append(month_label)
-        
-        # Count certificates for this month
-        count = Certificate.query.filter(
-            db.extract('year', Certificate.issue_date) == year,
-            db.extract('month', Certificate.issue_date) == month
-        ).count()
-        chart_data.append(count)
-
     return render_template('admin_dashboard.html',
-                         total_certificates=total_certificates,
+                         total_certificates=stats['total_certificates'],
                          total_students=total_students,
                          recent_certificates=recent_certificates,
                          recent_verifications=recent_verifications,
                          chain_info=chain_info,
-                         chart_labels=json.dumps(chart_labels),
-                         chart_data=json.dumps(chart_data))
+                         chart_labels=json.dumps(stats['chart_labels']),
+                         chart_data=json.dumps(stats['chart_data']))
 
 
 
-@app.route('/admin/batch-issue', methods=['GET', 'POST'])
+@main.route('/admin/batch-issue', methods=['GET', 'POST'])
 @admin_required
 def admin_batch_issue():
     """Batch issue certificates from Detailed CSV"""
@@ -249,27 +557,32 @@ def admin_batch_issue():
         # 2. Get CSV File
         if 'csv_file' not in request.files:
             flash('No CSV file uploaded.', 'error')
-            return redirect(url_for('admin_batch_issue'))
+            return redirect(url_for('main.admin_batch_issue'))
             
         csv_file = request.files['csv_file']
         if not csv_file or not csv_file.filename.endswith('.csv'):
             flash('Please upload a valid CSV file.', 'error')
-            return redirect(url_for('admin_batch_issue'))
+            return redirect(url_for('main.admin_batch_issue'))
 
         # 3. Process CSV
         try:
-            stream = io.StringIO(csv_file.stream.read().decode("UTF8", errors='ignore'), newline=None)
-            csv_reader = csv.DictReader(stream)
-            
-            # Normalize headers (strip whitespace)
-            csv_reader.fieldnames = [h.strip() for h in csv_reader.fieldnames]
-            
-            # Check for minimal required identification
-            if 'Student Name' not in csv_reader.fieldnames or 'Roll Number' not in csv_reader.fieldnames:
-                flash('CSV must contain at least "Student Name" and "Roll Number" columns.', 'error')
-                return redirect(url_for('admin_batch_issue'))
+            stage_seconds = {}  # Summed per stage over all rows, for the summary record
+            batch_started = time.perf_counter()
+            with timed('csv', stage_seconds):
+                stream = io.StringIO(csv_file.stream.read().decode("UTF8", errors='ignore'), newline=None)
+                csv_reader = csv.DictReader(stream)
+                
+                # Normalize headers (strip whitespace)
+                csv_reader.fieldnames = [h.strip() for h in csv_reader.fieldnames]
+                
+                # Check for minimal required identification
+                if 'Student Name' not in csv_reader.fieldnames or 'Roll Number' not in csv_reader.fieldnames:
+                    flash('CSV must contain at least "Student Name" and "Roll Number" columns.', 'error')
+                    return redirect(url_for('main.admin_batch_issue'))
+                rows = list(csv_reader)
                 
             success_count = 0
+            skipped_count = 0
             errors = []
             
             # PDF Config (Reusable)
@@ -299,7 +612,7 @@ def admin_batch_issue():
             }
             base_url = get_base_url()
 
-            for row_idx, row in enumerate(csv_reader):
+            for row_idx, row in enumerate(rows):
                 try:
                     # Helper to get value with fallback
                     def get_val(key, default=''):
@@ -311,6 +624,7 @@ def admin_batch_issue():
                     roll_number = get_val('Roll Number')
                     
                     if not student_name or not roll_number:
+                        skipped_count += 1
                         continue # Skip empty rows
 
                     # Extended Details (CSV > Form Default > Empty)
@@ -376,16 +690,17 @@ def admin_batch_issue():
                     # Check/Create Student User
                     student_user = None
                     if email:
-                        student_user = User.query.filter_by(email=email).first()
-                        if not student_user:
-                            username = email.split('@')[0]
-                            if User.query.filter_by(username=username).first():
-                                username = f"{username}_{int(datetime.now().timestamp())}"
-                                
-                            student_user = User(username=username, email=email, role='student')
-                            student_user.set_password('default123')
-                            db.session.add(student_user)
-                            db.session.flush()
+                        with timed('users', stage_seconds):
+                            student_user = User.query.filter_by(email=email).first()
+                            if not student_user:
+                                username = email.split('@')[0]
+                                if User.query.filter_by(username=username).first():
+                                    username = f"{username}_{int(datetime.now().timestamp())}"
+                                    
+                                student_user = User(username=username, email=email, role='student')
+                                student_user.set_password('default123')
+                                db.session.add(student_user)
+                                db.session.flush()
 
                     # Prepare Marksheet Data
                     marksheet_data = {
@@ -404,87 +719,112 @@ def admin_batch_issue():
                     }
 
                     # --- Certificate Generation Logic ---
-                    cert_id = f"{roll_number}_{int(datetime.utcnow().timestamp())}_{row_idx}"
+                    cert_id = f"{roll_number}_{int(datetime.utcnow().timestamp())}_{row_idx}_{secrets.token_hex(3)}"
                     pdf_filename = secure_filename(f"{student_name}_{roll_number}.pdf")
-                    pdf_path = os.path.join(app.config['UPLOAD_FOLDER'], pdf_filename)
+                    pdf_path = os.path.join(current_app.config['UPLOAD_FOLDER'], pdf_filename)
                     qr_filename = secure_filename(f"{cert_id}.png")
-                    qr_path = os.path.join(app.config['QR_FOLDER'], qr_filename)
+                    qr_path = os.path.join(current_app.config['QR_FOLDER'], qr_filename)
                     
-                    # Ensure QR folder exists
-                    os.makedirs(app.config['QR_FOLDER'], exist_ok=True)
+                    # Ensure output folders exist
+                    os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
+                    os.makedirs(current_app.config['QR_FOLDER'], exist_ok=True)
                     
                     # --- Fast Certificate Generation Logic (No Iterative Loop) ---
                     # 1. Generate URL with just Cert ID (Fast Verification)
                     verification_url = f"{base_url}/verify?cert_id={cert_id}"
                     
                     # 2. Render HTML
-                    html = render_template('certificate_template.html',
-                        name=student_name,
-                        roll_number=roll_number,
-                        father_name=father_name,
-                        mother_name=mother_name,
-                        college_id=college_id,
-                        college_name=college_name,
-                        university_name=university_name,
-                        university_address=university_address,
-                        degree_name=degree_name,
-                        semester_info=semester_info,
-                        result_date=result_date_obj.strftime('%d.%m.%Y'),
-                        issue_date=result_date_obj.strftime('%B %d, %Y'),
-                        subjects=subjects,
-                        cert_hash='', # Empty hash on PDF itself to avoid circular dependency loop
-                        cert_id=cert_id,
-                        verification_url=verification_url
-                    )
+                    with timed('render', stage_seconds):
+                        html = render_template('certificate_template.html',
+                            name=student_name,
+                            roll_number=roll_number,
+                            father_name=father_name,
+                            mother_name=mother_name,
+                            college_id=college_id,
+                            college_name=college_name,
+                            university_name=university_name,
+                            university_address=university_address,
+                            degree_name=degree_name,
+                            semester_info=semester_info,
+                            result_date=result_date_obj.strftime('%d.%m.%Y'),
+                            issue_date=result_date_obj.strftime('%B %d, %Y'),
+                            subjects=subjects,
+                            cert_hash='', # Empty hash on PDF itself to avoid circular dependency loop
+                            cert_id=cert_id,
+                            verification_url=verification_url
+                        )
                     
                     # 3. Generate PDF
-                    pdfkit.from_string(html, pdf_path, configuration=config, options=options)
-                    print(f"   ✓ PDF generated: {pdf_path}")
+                    with timed('pdf', stage_seconds), PDF_RENDER_LATENCY.time():
+                        pdfkit.from_string(html, pdf_path, configuration=config, options=options)
                     
                     # 4. Compute hash of the generated PDF
+                    pdf_size = None
                     try:
-                        with open(pdf_path, 'rb') as f:
-                            current_hash = hashlib.sha256(f.read()).hexdigest()
-                        print(f"   📊 Hash: {current_hash[:16]}...")
-                    except Exception as e:
-                        print(f"   ❌ Hash failed: {e}")
+                        with timed('hash', stage_seconds):
+                            hash_info = hash_file(pdf_path, chunk_size=current_app.config['HASH_CHUNK_SIZE'])
+                        current_hash = hash_info['hash']
+                        pdf_size = hash_info['bytes']
+                    except Exception:
+                        logger.warning('Hashing a batch certificate PDF failed', exc_info=True,
+                                       extra={'event': 'batch_issue.hash_failed', 'row': row_idx + 1, 'cert_id': cert_id})
                         current_hash = "ERROR_HASH_COMPUTATION"
 
                     # Add to Blockchain
-                    blockchain_data = json.dumps({'cert_id': cert_id, 'pdf_hash': current_hash}, sort_keys=True)
-                    new_block = blockchain.add_block(blockchain_data)
-                    print(f"\n✓ Added to blockchain at block #{new_block.index}")
+                    blockchain_data = json.dumps({'cert_id': cert_id, 'pdf_hash': current_hash, 'pdf_size': pdf_size}, sort_keys=True)
+                    with timed('ledger', stage_seconds), LEDGER_APPEND_LATENCY.time():
+                        new_block = blockchain.add_block(blockchain_data)
+                    LEDGER_HEIGHT.set(new_block.index + 1)
+                    verification_cache.invalidate(('cert_id', cert_id))
 
                     # Save to DB
-                    cert = Certificate(
-                        student_id=student_user.id if student_user else None,
-                        student_name=student_name,
-                        course_name=degree_name,
-                        issue_date=result_date_obj,
-                        issued_by=current_user.id,
-                        pdf_path=pdf_path,
-                        qr_path=qr_path,
-                        blockchain_hash=current_hash,
-                        block_index=new_block.index
-                    )
-                    cert.set_marksheet_data(marksheet_data)
-                    db.session.add(cert)
-                    db.session.flush()
+                    with timed('db', stage_seconds):
+                        cert = Certificate(
+                            cert_id=cert_id,
+                            student_id=student_user.id if student_user else None,
+                            student_name=student_name,
+                            course_name=degree_name,
+                            issue_date=result_date_obj,
+                            issued_by=current_user.id,
+                            pdf_path=pdf_path,
+                            qr_path=qr_path,
+                            blockchain_hash=current_hash,
+                            block_index=new_block.index
+                        )
+                        cert.set_marksheet_data(marksheet_data)
+                        db.session.add(cert)
+                        db.session.flush()
+                        record_issuance(result_date_obj)
                     
                     # Send email
                     if email:
-                        send_certificate_email(email, student_name, cert)
+                        with timed('email', stage_seconds):
+                            send_certificate_email(email, student_name, cert)
                         
                     success_count += 1
-                    print(f"✅ Certificate saved to database\n")
+                    logger.debug('Batch certificate issued', extra={
+                        'event': 'batch_issue.row', 'row': row_idx + 1, 'cert_id': cert_id,
+                        'block_index': new_block.index, 'pdf_hash': current_hash})
                     
                 except Exception as e:
                     errors.append(f"Row {row_idx+1}: {str(e)}")
-                    print(f"❌ Error processing row {row_idx}: {e}\n")
-                    import traceback
-                    traceback.print_exc()
+                    logger.debug('Batch row failed', exc_info=True,
+                                 extra={'event': 'batch_issue.row_failed', 'row': row_idx + 1})
 
-            db.session.commit()
+            with timed('db', stage_seconds):
+                db.session.commit()
+            CERTIFICATES_ISSUED.labels(mode='batch').inc(success_count)
+            logger.info('Batch issue finished', extra={
+                'event': 'batch_issue.summary',
+                'issued': success_count,
+                'failed': len(errors),
+                'skipped': skipped_count,
+                'duration_ms': round((time.perf_counter() - batch_started) * 1000, 1),
+                'stage_ms': {stage: round(seconds * 1000, 1) for stage, seconds in stage_seconds.items()},
+                'error_samples': errors[:5]
+            })
+            # Re-read facets after the commit, not from a flush-time snapshot
+            listing_cache.invalidate('course_facets')
             
             if success_count > 0:
                 flash(f'✅ Successfully issued {success_count} certificates!', 'success')
@@ -492,17 +832,17 @@ def admin_batch_issue():
             if errors:
                 flash(f'⚠️ Encountered {len(errors)} errors: {"; ".join(errors[:3])}...', 'warning')
                 
-            return redirect(url_for('admin_certificates'))
+            return redirect(url_for('main.admin_certificates'))
 
         except Exception as e:
             flash(f'❌ Error processing CSV: {str(e)}', 'error')
-            print(f"CSV Error: {e}")
-            return redirect(url_for('admin_batch_issue'))
+            logger.exception('Batch issue CSV failed', extra={'event': 'batch_issue.failed'})
+            return redirect(url_for('main.admin_batch_issue'))
 
     return render_template('admin_batch_issue.html')
 
 
-@app.route('/admin/sample-csv')
+@main.route('/admin/sample-csv')
 @admin_required
 def download_sample_csv():
     """Download sample CSV for comprehensive batch issue"""
@@ -545,7 +885,7 @@ def download_sample_csv():
     )
 
 
-@app.route('/admin/issue', methods=['GET', 'POST'])
+@main.route('/admin/issue', methods=['GET', 'POST'])
 @admin_required
 def admin_issue():
     """Issue new marksheet/certificate"""
@@ -603,28 +943,29 @@ def admin_issue():
         course_name = degree_name or semester_info or 'Marksheet'
 
         # Check if student exists
-        student_user = None
-        if student_email:
-            student_user = User.query.filter_by(email=student_email).first()
-            if not student_user:
-                email_prefix = student_email.split('@')[0]
-                student_user = User.query.filter_by(username=email_prefix).first()
-
-        if not student_user and student_name:
-            student_user = User.query.filter(
-                (User.username.ilike(f"%{student_name}%")) |
-                (User.email.ilike(f"%{student_name}%"))
-            ).filter_by(role='student').first()
-
-        if not student_user and student_email:
-            student_user = User(
-                username=student_email.split('@')[0],
-                email=student_email,
-                role='student'
-            )
-            student_user.set_password('default123')
-            db.session.add(student_user)
-            db.session.flush()
+        with timed('users'):
+            student_user = None
+            if student_email:
+                student_user = User.query.filter_by(email=student_email).first()
+                if not student_user:
+                    email_prefix = student_email.split('@')[0]
+                    student_user = User.query.filter_by(username=email_prefix).first()
+
+            if not student_user and student_name:
+                student_user = User.query.filter(
+                    (User.username.ilike(f"%{student_name}%")) |
+                    (User.email.ilike(f"%{student_name}%"))
+                ).filter_by(role='student').first()
+
+            if not student_user and student_email:
+                student_user = User(
+                    username=student_email.split('@')[0],
+                    email=student_email,
+                    role='student'
+                )
+                student_user.set_password('default123')
+                db.session.add(student_user)
+                db.session.flush()
 
         # Build marksheet data
         marksheet_data = {
@@ -642,23 +983,26 @@ def admin_issue():
             'subjects': subjects
         }
 
-        # Generate unique certificate ID
-        cert_id = f"{roll_number}_{int(datetime.utcnow().timestamp())}"
+        # Generate unique certificate ID; the random suffix keeps a form submitted twice
+        # in the same second from colliding on the unique cert_id after the ledger append
+        cert_id = f"{roll_number}_{int(datetime.utcnow().timestamp())}_{secrets.token_hex(3)}"
 
         # Generate PDF marksheet filename
         pdf_filename = secure_filename(f"{student_name}_{roll_number}.pdf")
-        pdf_path = os.path.join(app.config['UPLOAD_FOLDER'], pdf_filename)
+        pdf_path = os.path.join(current_app.config['UPLOAD_FOLDER'], pdf_filename)
 
-        # Ensure QR folder exists
-        os.makedirs(app.config['QR_FOLDER'], exist_ok=True)
+        # Ensure output folders exist
+        os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
+        os.makedirs(current_app.config['QR_FOLDER'], exist_ok=True)
 
         base_url = get_base_url()
         qr_filename = secure_filename(f"{cert_id}.png")
-        qr_path = os.path.join(app.config['QR_FOLDER'], qr_filename)
+        qr_path = os.path.join(current_app.config['QR_FOLDER'], qr_filename)
         
         # Initialize hash iteration
         previous_hash = None
         current_hash = None
+        pdf_size = None
         max_iterations = 5
         iteration = 0
         
@@ -689,140 +1033,133 @@ def admin_issue():
             'margin-right': '10mm'
         }
         
-        print(f"\n{'='*60}")
-        print(f"Generating certificate for: {student_name}")
-        print(f"Roll Number: {roll_number}")
-        print(f"{'='*60}")
+        issue_log = {'cert_id': cert_id, 'roll_number': roll_number}
         
         # Iterate until hash stabilizes
         while iteration < max_iterations:
             iteration += 1
             
-            print(f"\n🔄 Iteration {iteration}:")
-            
             # Generate verification URL
             if current_hash:
                 verification_url = f"{base_url}/verify?cert_id={cert_id}&hash={current_hash}"
             else:
                 verification_url = f"{base_url}/verify?cert_id={cert_id}"
             
-            print(f"   URL: {verification_url}")
-            
 
             # Generate PDF with QR code embedded
-            print(f"   ⏳ Rendering HTML template...")
-            html = render_template(
-                'certificate_template.html',
-                name=student_name,
-                roll_number=roll_number,
-                father_name=father_name,
-                mother_name=mother_name,
-                college_id=college_id,
-                college_name=college_name,
-                university_name=university_name,
-                university_address=university_address,
-                degree_name=degree_name,
-                semester_info=semester_info,
-                result_date=result_date_obj.strftime('%d.%m.%Y'),
-                issue_date=result_date_obj.strftime('%B %d, %Y'),
-                subjects=subjects,
-
-                # qr_code_base64 removed
-                # qr_code_path removed
-                cert_hash=current_hash or '',
-                cert_id=cert_id,
-                verification_url=verification_url
-            )
-            
-            print(f"   ✓ HTML rendered")
+            with timed('render'):
+                html = render_template(
+                    'certificate_template.html',
+                    name=student_name,
+                    roll_number=roll_number,
+                    father_name=father_name,
+                    mother_name=mother_name,
+                    college_id=college_id,
+                    college_name=college_name,
+                    university_name=university_name,
+                    university_address=university_address,
+                    degree_name=degree_name,
+                    semester_info=semester_info,
+                    result_date=result_date_obj.strftime('%d.%m.%Y'),
+                    issue_date=result_date_obj.strftime('%B %d, %Y'),
+                    subjects=subjects,
+
+                    # qr_code_base64 removed
+                    # qr_code_path removed
+                    cert_hash=current_hash or '',
+                    cert_id=cert_id,
+                    verification_url=verification_url
+                )
             
             try:
-                print(f"   ⏳ Generating PDF...")
-                pdfkit.from_string(html, pdf_path, configuration=config, options=options)
-                print(f"   ✓ PDF generated: {pdf_path}")
-                
+                with timed('pdf'), PDF_RENDER_LATENCY.time():
+                    pdfkit.from_string(html, pdf_path, configuration=config, options=options)
             except Exception as e:
                 flash(f'❌ PDF generation error: {str(e)}. Please ensure wkhtmltopdf is installed.', 'error')
-                print(f"❌ PDF Error: {e}")
+                logger.exception('Certificate PDF generation failed', extra={'event': 'issue.pdf_failed', **issue_log})
                 return render_template('admin_issue.html')
             
             # Compute hash of generated PDF
             try:
-                with open(pdf_path, 'rb') as f:
-                    pdf_bytes = f.read()
+                with timed('hash'):
+                    hash_info = hash_file(pdf_path, chunk_size=current_app.config['HASH_CHUNK_SIZE'])
                 previous_hash = current_hash
-                current_hash = hashlib.sha256(pdf_bytes).hexdigest()
-                
-                print(f"   📊 Hash: {current_hash[:16]}...")
+                current_hash = hash_info['hash']
+                pdf_size = hash_info['bytes']
+                logger.debug('Certificate PDF hashed', extra={
+                    'event': 'issue.iteration', 'iteration': iteration, 'pdf_hash': current_hash, **issue_log})
                 
             except Exception as e:
                 flash(f'❌ Error computing hash: {str(e)}', 'error')
-                print(f"❌ Hash Error: {e}")
+                logger.exception('Certificate PDF hashing failed', extra={'event': 'issue.hash_failed', **issue_log})
                 return render_template('admin_issue.html')
             
             # Check convergence
             if previous_hash == current_hash:
-                print(f"   ✅ Hash converged! Stable after iteration {iteration}")
                 break
         
         final_pdf_hash = current_hash
         
-        print(f"\n📋 Final Hash: {final_pdf_hash}")
-        
         # Store final hash on blockchain
         try:
-            print(f"⏳ Adding to blockchain...")
             blockchain_data = json.dumps({
                 'cert_id': cert_id,
-                'pdf_hash': final_pdf_hash
+                'pdf_hash': final_pdf_hash,
+                'pdf_size': pdf_size
             }, sort_keys=True)
-            new_block = blockchain.add_block(blockchain_data)
-            print(f"✅ Added to blockchain at block #{new_block.index}")
+            with timed('ledger'), LEDGER_APPEND_LATENCY.time():
+                new_block = blockchain.add_block(blockchain_data)
+            LEDGER_HEIGHT.set(new_block.index + 1)
+            verification_cache.invalidate(('cert_id', cert_id))
             
         except Exception as e:
             flash(f'❌ Blockchain error: {str(e)}', 'error')
-            print(f"❌ Blockchain Error: {e}")
+            logger.exception('Ledger append failed', extra={'event': 'issue.ledger_failed', **issue_log})
             return render_template('admin_issue.html')
 
         # Save certificate to database
         try:
-            print(f"⏳ Saving to database...")
-            certificate = Certificate(
-                student_id=student_user.id if student_user else None,
-                student_name=student_name,
-                course_name=course_name,
-                issue_date=result_date_obj,
-                issued_by=current_user.id,
-                pdf_path=pdf_path,
-                qr_path=qr_path,
-                blockchain_hash=final_pdf_hash,
-                block_index=new_block.index
-            )
-            certificate.set_marksheet_data(marksheet_data)
-            db.session.add(certificate)
-            db.session.commit()
-            print(f"✅ Certificate saved to database")
+            with timed('db'):
+                certificate = Certificate(
+                    cert_id=cert_id,
+                    student_id=student_user.id if student_user else None,
+                    student_name=student_name,
+                    course_name=course_name,
+                    issue_date=result_date_obj,
+                    issued_by=current_user.id,
+                    pdf_path=pdf_path,
+                    qr_path=qr_path,
+                    blockchain_hash=final_pdf_hash,
+                    block_index=new_block.index
+                )
+                certificate.set_marksheet_data(marksheet_data)
+                db.session.add(certificate)
+                record_issuance(result_date_obj)
+                db.session.commit()
+            CERTIFICATES_ISSUED.labels(mode='single').inc()
+            listing_cache.invalidate('course_facets')
 
             # Send email
             if student_email:
-                send_certificate_email(student_email, student_name, certificate)
+                with timed('email'):
+                    send_certificate_email(student_email, student_name, certificate)
 
             flash(f'✅ Marksheet issued successfully for {student_name}! Certificate ID: {cert_id}', 'success')
-            print(f"\n{'='*60}")
-            print(f"✅ PROCESS COMPLETE")
-            print(f"{'='*60}\n")
-            return redirect(url_for('admin_certificates'))
+            logger.info('Certificate issued', extra={
+                'event': 'issue.done', 'iterations': iteration, 'block_index': new_block.index,
+                'pdf_hash': final_pdf_hash, **issue_log})
+            return redirect(url_for('main.admin_certificates'))
             
         except Exception as e:
             db.session.rollback()
             flash(f'❌ Database error: {str(e)}', 'error')
-            print(f"❌ Database Error: {e}")
+            logger.exception('Saving the issued certificate failed', extra={'event': 'issue.db_failed', **issue_log})
             return render_template('admin_issue.html')
 
     return render_template('admin_issue.html')
 
 
-@app.route('/admin/students', methods=['GET', 'POST'])
+@main.route('/admin/students', methods=['GET', 'POST'])
 @admin_required
 def admin_students():
     """Manage students - create, view, and manage student accounts"""
@@ -833,19 +1170,19 @@ def admin_students():
 
         if not username or not email or not password:
             flash('Please fill in all required fields.', 'error')
-            return redirect(url_for('admin_students'))
+            return redirect(url_for('main.admin_students'))
 
         if len(password) < 6:
             flash('Password must be at least 6 characters long.', 'error')
-            return redirect(url_for('admin_students'))
+            return redirect(url_for('main.admin_students'))
 
         if User.query.filter_by(username=username).first():
             flash(f'Username "{username}" already exists. Please choose a different one.', 'error')
-            return redirect(url_for('admin_students'))
+            return redirect(url_for('main.admin_students'))
 
         if User.query.filter_by(email=email).first():
             flash(f'Email "{email}" is already registered.', 'error')
-            return redirect(url_for('admin_students'))
+            return redirect(url_for('main.admin_students'))
 
         new_student = User(
             username=username,
@@ -858,26 +1195,44 @@ def admin_students():
             db.session.add(new_student)
             db.session.commit()
             flash(f'✅ Student account created successfully! Username: {username}', 'success')
-            return redirect(url_for('admin_students'))
+            return redirect(url_for('main.admin_students'))
         except Exception as e:
             db.session.rollback()
             flash(f'❌ Error creating student account: {str(e)}', 'error')
-            return redirect(url_for('admin_students'))
+            return redirect(url_for('main.admin_students'))
 
     page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     search = request.args.get('search', '').strip()
 
-    query = User.query.filter_by(role='student')
-
-    if search:
+    # The table shows certificate counts: load ids for the whole page in one query
+    query = User.query.filter_by(role='student') \
+        .options(selectinload(User.certificates).load_only(Certificate.id, Certificate.student_id))
+    per_page = current_app.config['CERTIFICATES_PER_PAGE']
+
+    if not search:
+        # Plain listing: keyset pages on (created_at, id), no OFFSET or COUNT
+        pagination = keyset_paginate(query, User.created_at, User.id, cursor=cursor, per_page=per_page)
+        return render_template('admin_students.html',
+                             students=pagination.items,
+                             pagination=pagination,
+                             total_students=get_student_count(),
+                             search=search)
+
+    order_by = [User.created_at.desc()]
+    ranked = search_subquery('users', search) if current_app.config['FULL_TEXT_SEARCH'] and search_index_available() else None
+    if ranked is not None:
+        query = query.join(ranked, User.id == ranked.c.id)
+        order_by.insert(0, ranked.c.score.desc())
+    else:
         query = query.filter(
             (User.username.contains(search)) |
             (User.email.contains(search))
         )
 
-    pagination = query.order_by(User.created_at.desc()).paginate(
+    pagination = query.order_by(*order_by).paginate(
         page=page,
-        per_page=app.config['CERTIFICATES_PER_PAGE'],
+        per_page=per_page,
         error_out=False
     )
 
@@ -886,10 +1241,11 @@ def admin_students():
     return render_template('admin_students.html',
                          students=students,
                          pagination=pagination,
+                         total_students=pagination.total,
                          search=search)
 
 
-@app.route('/admin/students/<int:user_id>/delete', methods=['POST'])
+@main.route('/admin/students/<int:user_id>/delete', methods=['POST'])
 @admin_required
 def delete_student(user_id):
     """Delete a student account"""
@@ -897,12 +1253,12 @@ def delete_student(user_id):
 
     if student.role != 'student':
         flash('Only student accounts can be deleted through this route.', 'error')
-        return redirect(url_for('admin_students'))
+        return redirect(url_for('main.admin_students'))
 
     cert_count = Certificate.query.filter_by(student_id=user_id).count()
     if cert_count > 0:
         flash(f'❌ Cannot delete student. They have {cert_count} certificate(s) associated.', 'error')
-        return redirect(url_for('admin_students'))
+        return redirect(url_for('main.admin_students'))
 
     try:
         db.session.delete(student)
@@ -912,10 +1268,10 @@ def delete_student(user_id):
         db.session.rollback()
         flash(f'❌ Error deleting student: {str(e)}', 'error')
 
-    return redirect(url_for('admin_students'))
+    return redirect(url_for('main.admin_students'))
 
 
-@app.route('/admin/students/<int:user_id>/reset-password', methods=['POST'])
+@main.route('/admin/students/<int:user_id>/reset-password', methods=['POST'])
 @admin_required
 def reset_student_password(user_id):
     """Reset student password"""
@@ -923,13 +1279,13 @@ def reset_student_password(user_id):
 
     if student.role != 'student':
         flash('Only student passwords can be reset through this route.', 'error')
-        return redirect(url_for('admin_students'))
+        return redirect(url_for('main.admin_students'))
 
     new_password = request.form.get('new_password', '').strip()
 
     if not new_password or len(new_password) < 6:
         flash('Password must be at least 6 characters long.', 'error')
-        return redirect(url_for('admin_students'))
+        return redirect(url_for('main.admin_students'))
 
     try:
         student.set_password(new_password)
@@ -939,116 +1295,130 @@ def reset_student_password(user_id):
         db.session.rollback()
         flash(f'❌ Error resetting password: {str(e)}', 'error')
 
-    return redirect(url_for('admin_students'))
+    return redirect(url_for('main.admin_students'))
 
 
-@app.route('/admin/certificates')
+@main.route('/admin/certificates')
 @admin_required
 def admin_certificates():
     """View all certificates with search and pagination"""
     page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     search = request.args.get('search', '').strip()
     course_filter = request.args.get('course', '').strip()
 
     query = Certificate.query
-
-    if search:
-        query = query.filter(
-            (Certificate.student_name.contains(search)) |
-            (Certificate.course_name.contains(search)) |
-            (Certificate.blockchain_hash.contains(search))
-        )
-
     if course_filter:
         query = query.filter(Certificate.course_name == course_filter)
 
-    pagination = query.order_by(Certificate.issue_date.desc()).paginate(
-        page=page,
-        per_page=app.config['CERTIFICATES_PER_PAGE'],
-        error_out=False
-    )
+    per_page = current_app.config['CERTIFICATES_PER_PAGE']
 
-    certificates = pagination.items
-    courses = db.session.query(Certificate.course_name.distinct()).all()
-    course_list = [c[0] for c in courses]
+    if not search:
+        # Plain listing: keyset pages on (issue_date, id), no OFFSET or COUNT
+        pagination = keyset_paginate(query, Certificate.issue_date, Certificate.id, cursor=cursor, per_page=per_page)
+    else:
+        order_by = [Certificate.issue_date.desc()]
+
+        # Ranked full-text match (prefix terms: partial hashes and roll numbers work)
+        ranked = search_subquery('certificates', search) if current_app.config['FULL_TEXT_SEARCH'] and search_index_available() else None
+        if ranked is not None:
+            query = query.join(ranked, Certificate.id == ranked.c.id)
+            order_by.insert(0, ranked.c.score.desc())
+        else:
+            query = query.filter(
+                (Certificate.student_name.contains(search)) |
+                (Certificate.course_name.contains(search)) |
+                (Certificate.blockchain_hash.contains(search))
+            )
+
+        pagination = query.order_by(*order_by).paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
 
     return render_template('admin_certificates.html',
-                         certificates=certificates,
+                         certificates=pagination.items,
                          pagination=pagination,
                          search=search,
                          course_filter=course_filter,
-                         courses=course_list)
+                         courses=get_course_facets())
 
 
-@app.route('/student/dashboard')
+@main.route('/student/dashboard')
 @login_required
 def student_dashboard():
     """Student dashboard"""
+    cursor = request.args.get('cursor')
+    per_page = current_app.config['CERTIFICATES_PER_PAGE']
+
+    query = Certificate.query
     if current_user.is_admin():
-        certificates = Certificate.query.order_by(Certificate.issue_date.desc()).all()
+        course_stats = dict(get_course_facets())
     else:
-        linked_certs = Certificate.query.filter_by(student_id=current_user.id).all()
-        name_matched_certs = Certificate.query.filter(
-            Certificate.student_name.ilike(f"%{current_user.username}%")
-        ).filter(
-            Certificate.student_id.is_(None)
-        ).all()
-
-        all_cert_ids = {c.id for c in linked_certs}
-        for cert in name_matched_certs:
-            if cert.id not in all_cert_ids:
-                linked_certs.append(cert)
-
-        certificates = sorted(linked_certs, key=lambda x: x.issue_date, reverse=True)
-
-    # Calculate course stats ONLY for this student's certificates
-    course_stats = {}
-    for cert in certificates:
-        course_stats[cert.course_name] = course_stats.get(cert.course_name, 0) + 1
-
-    # Additional statistics
-    latest_cert_date = certificates[0].issue_date if certificates else None
-    total_courses = len(course_stats)
-    
+        # Linked certificates plus unlinked ones issued under the student's name. The two
+        # branches are disjoint on student_id, so no row can appear twice, and both are
+        # served by the (student_id, issue_date) index.
+        query = query.filter(or_(
+            Certificate.student_id == current_user.id,
+            and_(Certificate.student_id.is_(None),
+                 Certificate.student_name.ilike(f"%{current_user.username}%"))
+        ))
+        # Per-course counts for this student's certificates in one GROUP BY
+        course_stats = dict(query.with_entities(Certificate.course_name, func.count(Certificate.id))
+                            .group_by(Certificate.course_name).all())
+
+    pagination = keyset_paginate(query, Certificate.issue_date, Certificate.id, cursor=cursor, per_page=per_page)
+    certificates = pagination.items
+
+    # Newest certificate: the first row of the first page, otherwise one indexed lookup
+    if not cursor:
+        latest = certificates[0] if certificates else None
+    else:
+        latest = query.with_entities(Certificate.id, Certificate.issue_date) \
+            .order_by(Certificate.issue_date.desc(), Certificate.id.desc()).first()
+
     # User profile info
     user_info = {
         'username': current_user.username,
         'email': current_user.email,
         'member_since': current_user.created_at,
-        'total_certificates': len(certificates),
-        'total_courses': total_courses,
-        'latest_cert_date': latest_cert_date
+        'total_certificates': sum(course_stats.values()),
+        'total_courses': len(course_stats),
+        'latest_cert_date': latest.issue_date if latest else None,
+        'latest_cert_id': latest.id if latest else None
     }
 
     return render_template('student_dashboard.html',
                          certificates=certificates,
+                         pagination=pagination,
                          course_stats=course_stats,
                          user_info=user_info)
 
 
-@app.route('/student/claim', methods=['POST'])
+@main.route('/student/claim', methods=['POST'])
 @login_required
 def claim_certificate():
     """Allow student to claim/link a certificate by hash"""
     if current_user.is_admin():
         flash('Admins cannot claim certificates.', 'error')
-        return redirect(url_for('admin_dashboard'))
+        return redirect(url_for('main.admin_dashboard'))
 
     cert_hash = request.form.get('hash', '').strip()
     if not cert_hash:
         flash('Please provide a certificate hash.', 'error')
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     certificate = Certificate.query.filter_by(blockchain_hash=cert_hash).first()
 
     if not certificate:
         flash('Certificate not found with the provided hash.', 'error')
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     if certificate.student_name.lower() != current_user.username.lower() and \
        certificate.student_name.lower() not in current_user.email.lower():
         flash('This certificate does not appear to belong to you. Name mismatch.', 'error')
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     if certificate.student_id != current_user.id:
         certificate.student_id = current_user.id
@@ -1057,91 +1427,42 @@ def claim_certificate():
     else:
         flash('✅ Certificate is already linked to your account.', 'info')
 
-    return redirect(url_for('student_dashboard'))
+    return redirect(url_for('main.student_dashboard'))
 
 
-@app.route('/verify', methods=['GET', 'POST'])
+@main.route('/verify', methods=['GET', 'POST'])
 def verify():
     """Verify certificate - shows verification page"""
     cert_id = request.args.get('cert_id', '').strip()
     qr_hash = request.args.get('hash', '').strip()
 
     if cert_id:
-        certificate = None
-        try:
-            # First try finding by cert_id if available (Fast Mode)
-             # If cert_id is passed, we can look up the certificate details to show them
-             # checking by blockchain hash if provided is also good
-            if qr_hash:
-                 certificate = Certificate.query.filter_by(blockchain_hash=qr_hash).first()
-            
-            if not certificate:
-                 # Fallback: Find by partial ID if needed or just use ID to verify consistency
-                 # In this system, we don't have a direct Cert ID lookup function in the model shown, 
-                 # but we can filter by the stored ID string
-                 # We need to find the certificate where cert_id matches? 
-                 # The Certificate model doesn't explicitly store 'cert_id' string as a column in the snippet, 
-                 # but the 'blockchain_hash' is stored.
-                 # Wait, looking at the models import...
-                 # The snippet creates `cert_id = f"{roll_number}..."` but how is it stored?
-                 # Ah, line 449: `blockchain_data = json.dumps({'cert_id': cert_id, ...})`.
-                 # The Certificate model has: student_id, student_name, etc.
-                 # Does it have 'cert_id' column?? 
-                 # Let's check the Certificate model via db query or by inferring. 
-                 # Line 82: `send_certificate_email(..., certificate.id)` -> integer ID.
-                 # The string `cert_id` might ONLY be in the blockchain data!
-                 # FAIL SAFE: We can't query standard DB by the custom string `cert_id` easily unless it's stored.
-                 # Looking at line 464 in `admin_batch_issue`: `cert = Certificate(...)`. It DOES NOT seem to store the string `cert_id`.
-                 # However, `admin_issue` line 778 says `Certificate ID: {cert_id}`.
-                 # Re-reading `models.py` imports... I only saw `models` import in `app.py`.
-                 # I need to check `models.py` or `admin_issue` logic. `admin_issue` saves to DB but uses `cert.id` (int) usually.
-                 # WAIT! In the batch issue I see: `cert_id` string is generated.
-                 # If I can't look up by `cert_id` string, I can't implement ID-based verification easily!
-                 # I need to check `models.py` content to see if I can query by that string.
-                 # For now, I'll assume I can't and use a workaround or check the model.
-                 # ACTUALLY, I can verify by just looping through blockchain or ... no that's slow.
-                 # Let's check `models/` directory or `models.py`.
-                 pass
-        except:
-             pass
-        
-        # If we can't find the certificate object easily without hash, 
-        # we can still render the page with just the ID and let the upload/hash check do the work.
-        # The upload check uses `blockchain.get_hash_by_cert_id(cert_id)`.
-        # So `blockchain.py` MUST have a way to get hash by ID.
-        # If `blockchain.py` has `get_hash_by_cert_id`, then my verification logic is safe!
-        
-        return render_template('verify_public.html',
-                             cert_id=cert_id,
-                             qr_hash=qr_hash,
-                             certificate=certificate,
-                             result=None)
+        # Show the issued certificate's details before the PDF is uploaded
+        with timed('lookup'):
+            certificate = get_verification_by_cert_id(cert_id)['certificate']
+
+        with timed('render'):
+            return render_template('verify_public.html',
+                                 cert_id=cert_id,
+                                 qr_hash=qr_hash,
+                                 certificate=certificate,
+                                 result=None)
 
     hash_input = request.args.get('hash', '').strip() or request.form.get('hash', '').strip()
 
     if hash_input:
-        block_index = blockchain.verify_certificate(hash_input)
-        certificate = Certificate.query.filter_by(blockchain_hash=hash_input).first()
-
-        if block_index is not None:
-            block = blockchain.get_block_by_hash(hash_input)
-            result = 'Valid'
-            block_info = {
-                'index': block.index,
-                'hash': block.hash,
-                'previous_hash': block.previous_hash,
-                'timestamp': block.timestamp.isoformat()
-            }
-        else:
-            result = 'Invalid'
-            block_info = None
-
-        return render_template('verify_public.html',
-                             result=result,
-                             certificate=certificate,
-                             block_info=block_info,
-                             cert_id=None,
-                             qr_hash=hash_input)
+        with timed('lookup'):
+            verification = get_verification_by_hash(hash_input)
+        result = 'Valid' if verification['valid'] else 'Invalid'
+        record_verification('hash', result)
+
+        with timed('render'):
+            return render_template('verify_public.html',
+                                 result=result,
+                                 certificate=verification['certificate'],
+                                 block_info=verification['block_info'],
+                                 cert_id=None,
+                                 qr_hash=hash_input)
 
     return render_template('verify_public.html',
                          cert_id=None,
@@ -1150,7 +1471,7 @@ def verify():
                          certificate=None)
 
 
-@app.route('/verify_upload', methods=['POST'])
+@main.route('/verify_upload', methods=['POST'])
 def verify_upload():
     """Verify uploaded PDF by comparing hashes"""
     cert_id = request.form.get('cert_id', '').strip()
@@ -1158,55 +1479,58 @@ def verify_upload():
 
     if not cert_id:
         flash('Missing certificate ID.', 'error')
-        return redirect(url_for('verify'))
+        return redirect(url_for('main.verify'))
 
     if 'file' not in request.files:
         flash('No file uploaded.', 'error')
-        return redirect(url_for('verify', cert_id=cert_id, hash=qr_hash))
+        return redirect(url_for('main.verify', cert_id=cert_id, hash=qr_hash))
 
     uploaded_file = request.files['file']
 
     if uploaded_file.filename == '':
         flash('No file selected.', 'error')
-        return redirect(url_for('verify', cert_id=cert_id, hash=qr_hash))
+        return redirect(url_for('main.verify', cert_id=cert_id, hash=qr_hash))
 
     if not uploaded_file.filename.lower().endswith('.pdf'):
         flash('Please upload a PDF file.', 'error')
-        return redirect(url_for('verify', cert_id=cert_id, hash=qr_hash))
+        return redirect(url_for('main.verify', cert_id=cert_id, hash=qr_hash))
 
     try:
-        uploaded_bytes = uploaded_file.read()
-        uploaded_hash = hashlib.sha256(uploaded_bytes).hexdigest()
-        chain_hash = blockchain.get_hash_by_cert_id(cert_id)
+        with timed('lookup'):
+            verification = get_verification_by_cert_id(cert_id)
+        chain_hash = verification['chain_hash']
+        expected_size = verification['expected_size']
+        certificate = verification['certificate']
+
+        # Werkzeug spools large uploads to a temp file, so size it and hash it
+        # from the stream in chunks instead of reading the whole PDF into memory.
+        # A size that differs from the one recorded at issuance can never match,
+        # so skip hashing entirely in that case.
+        with timed('hash'):
+            upload_size = get_stream_size(uploaded_file.stream)
+            if expected_size is not None and upload_size is not None and upload_size != expected_size:
+                hash_info = None
+            else:
+                hash_info = hash_stream(uploaded_file.stream,
+                                        chunk_size=current_app.config['HASH_CHUNK_SIZE'],
+                                        max_bytes=expected_size)
+                if hash_info['exceeded']:
+                    hash_info = None
+
+        uploaded_hash = hash_info['hash'] if hash_info else None
+        size_mismatch = hash_info is None
 
         block_info = None
-        
-        # Fetch certificate details from DB
-        certificate = Certificate.query.filter_by(blockchain_hash=chain_hash).first()
-        
-        # Fix: Detach certificate from session before modifying marksheet_data for display
-        # This prevents "type dict not supported" error when commiting the log
-        if certificate:
-            db.session.expunge(certificate)
-            # Parse marksheet_data if it's a string (JSON)
-            if certificate.marksheet_data and isinstance(certificate.marksheet_data, str):
-                try:
-                    certificate.marksheet_data = json.loads(certificate.marksheet_data)
-                except:
-                    certificate.marksheet_data = {}
 
-        if uploaded_hash == chain_hash:
+        if size_mismatch:
+            result = "Tampered"
+            verification_msg = '❌ Certificate has been altered! File size does not match the issued PDF.'
+            status_log = 'Tampered'
+        elif uploaded_hash == chain_hash:
             result = "Valid"
             
-            # Fetch block info for display
-            block = blockchain.get_block_by_hash(chain_hash)
-            if block:
-                block_info = {
-                    'index': block.index,
-                    'hash': block.hash,
-                    'previous_hash': block.previous_hash,
-                    'timestamp': block.timestamp.isoformat()
-                }
+            # Block info for display
+            block_info = verification['block_info']
             verification_msg = '✅ Certificate is authentic and has not been tampered with.'
             status_log = 'Valid'
         else:
@@ -1214,32 +1538,34 @@ def verify_upload():
             verification_msg = '❌ Certificate has been altered! Hashes do not match.'
             status_log = 'Tampered'
 
-        log = VerificationLog(
-            certificate_id=certificate.id if certificate else None,
-            blockchain_hash=uploaded_hash,
-            status=status_log,
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent', '')
-        )
-        db.session.add(log)
-        db.session.commit()
+        record_verification('upload', status_log)
+        with timed('log'):
+            log_buffer.add(
+                certificate_id=certificate['id'] if certificate else None,
+                blockchain_hash=uploaded_hash or 'SIZE_MISMATCH',
+                status=status_log,
+                ip_address=request.remote_addr,
+                user_agent=request.headers.get('User-Agent', '')
+            )
 
-        return render_template('verify_public.html',
-                             cert_id=cert_id,
-                             qr_hash=qr_hash,
-                             uploaded_hash=uploaded_hash,
-                             chain_hash=chain_hash,
-                             result=result,
-                             certificate=certificate,
-                             block_info=block_info,
-                             verification_message=verification_msg)
+        with timed('render'):
+            return render_template('verify_public.html',
+                                 cert_id=cert_id,
+                                 qr_hash=qr_hash,
+                                 uploaded_hash=uploaded_hash,
+                                 chain_hash=chain_hash,
+                                 result=result,
+                                 certificate=certificate,
+                                 block_info=block_info,
+                                 verification_message=verification_msg,
+                                 hash_timing=hash_info)
 
     except Exception as e:
         flash(f'❌ Error verifying certificate: {str(e)}', 'error')
-        return redirect(url_for('verify', cert_id=cert_id, hash=qr_hash))
+        return redirect(url_for('main.verify', cert_id=cert_id, hash=qr_hash))
 
 
-@app.route('/blockchain')
+@main.route('/blockchain')
 def blockchain_explorer():
     """Public blockchain explorer"""
     chain_data = []
@@ -1264,7 +1590,7 @@ def blockchain_explorer():
     return render_template('blockchain.html', chain=chain_data)
 
 
-@app.route('/certificate/<int:cert_id>/download')
+@main.route('/certificate/<int:cert_id>/download')
 @login_required
 def download_certificate(cert_id):
     """Download certificate PDF"""
@@ -1272,16 +1598,16 @@ def download_certificate(cert_id):
 
     if not current_user.is_admin() and certificate.student_id != current_user.id:
         flash('You do not have permission to access this certificate.', 'error')
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     if not os.path.exists(certificate.pdf_path):
         flash('Certificate file not found.', 'error')
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     return send_file(certificate.pdf_path, as_attachment=True, download_name=f"{certificate.student_name}_{certificate.course_name}.pdf")
 
 
-@app.route('/certificate/<int:cert_id>/view')
+@main.route('/certificate/<int:cert_id>/view')
 @login_required
 def view_certificate(cert_id):
     """View certificate PDF"""
@@ -1289,16 +1615,16 @@ def view_certificate(cert_id):
 
     if not current_user.is_admin() and certificate.student_id != current_user.id:
         flash('You do not have permission to access this certificate.', 'error')
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     if not os.path.exists(certificate.pdf_path):
         flash('Certificate file not found.', 'error')
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     return send_file(certificate.pdf_path)
 
 
-@app.route('/api/blockchain/status')
+@main.route('/api/blockchain/status')
 @login_required
 def blockchain_status():
     """API endpoint for blockchain status"""
@@ -1309,7 +1635,7 @@ def blockchain_status():
     return jsonify(info)
 
 
-@app.route('/api/verify/qr', methods=['POST'])
+@main.route('/api/verify/qr', methods=['POST'])
 def verify_qr():
     """API endpoint for QR code verification"""
     data = request.get_json()
@@ -1318,84 +1644,325 @@ def verify_qr():
     if not hash_input:
         return jsonify({'error': 'Hash required'}), 400
 
-    block_index = blockchain.verify_certificate(hash_input)
-    certificate = Certificate.query.filter_by(blockchain_hash=hash_input).first()
+    with timed('lookup'):
+        verification = get_verification_by_hash(hash_input)
+    certificate = verification['certificate']
+    block_info = verification['block_info']
+    record_verification('qr', 'Valid' if verification['valid'] else 'Invalid')
 
-    if block_index is not None:
-        block = blockchain.get_block_by_hash(hash_input)
+    if verification['valid']:
         return jsonify({
             'valid': True,
             'certificate': {
-                'student_name': certificate.student_name if certificate else None,
-                'course_name': certificate.course_name if certificate else None,
-                'issue_date': certificate.issue_date.isoformat() if certificate else None
+                'student_name': certificate['student_name'] if certificate else None,
+                'course_name': certificate['course_name'] if certificate else None,
+                'issue_date': certificate['issue_date'].isoformat() if certificate else None
             },
             'block': {
-                'index': block.index,
-                'hash': block.hash,
-                'timestamp': block.timestamp.isoformat()
+                'index': block_info['index'],
+                'hash': block_info['hash'],
+                'timestamp': block_info['timestamp']
             }
         })
     else:
         return jsonify({'valid': False})
 
 
+@main.route('/api/verify/batch', methods=['POST'])
+def verify_batch():
+    """
+    API endpoint to verify many certificates at once.
+    Accepts JSON {"hashes": [...], "cert_ids": [...]}, a JSON list of hashes
+    and/or cert_ids, or a ZIP of PDFs uploaded as "file"; streams one JSON
+    result per line (NDJSON).
+    """
+    max_items = current_app.config['BATCH_VERIFY_MAX_ITEMS']
+    archive = None
+    members = []
+    hashes = []
+    cert_ids = []
+
+    if 'file' in request.files:
+        try:
+            archive = zipfile.ZipFile(request.files['file'].stream)
+        except zipfile.BadZipFile:
+            return jsonify({'error': 'File must be a ZIP archive of PDFs'}), 400
+
+        members = [info for info in archive.infolist()
+                   if not info.is_dir() and info.filename.lower().endswith('.pdf')]
+        if not members:
+            return jsonify({'error': 'ZIP archive contains no PDF files'}), 400
+        if len(members) > max_items:
+            return jsonify({'error': f'At most {max_items} PDFs per request'}), 400
+        if any(info.file_size > current_app.config['MAX_CONTENT_LENGTH'] for info in members):
+            return jsonify({'error': 'ZIP archive contains a PDF that is too large'}), 400
+        # Declared sizes of a well-compressed ZIP can add up to far more than the upload
+        if sum(info.file_size for info in members) > current_app.config['BATCH_VERIFY_MAX_BYTES']:
+            return jsonify({'error': 'ZIP archive PDFs are too large in total'}), 400
+    else:
+        data = request.get_json(silent=True)
+        if data is None:
+            data = {}
+        if isinstance(data, list):
+            raw_items = [data]
+        elif isinstance(data, dict):
+            raw_items = [data.get('hashes', []), data.get('cert_ids', [])]
+            if not all(isinstance(items, list) for items in raw_items):
+                return jsonify({'error': 'hashes and cert_ids must be lists'}), 400
+        else:
+            return jsonify({'error': 'JSON body must be an object or a list'}), 400
+        if not all(isinstance(item, str) for items in raw_items for item in items):
+            return jsonify({'error': 'Hashes and cert_ids must be strings'}), 400
+
+        if isinstance(data, list):
+            hashes, cert_ids = split_batch_items(data)
+        else:
+            hashes = [h.strip() for h in raw_items[0] if h.strip()]
+            cert_ids = [c.strip() for c in raw_items[1] if c.strip()]
+        if not hashes and not cert_ids:
+            return jsonify({'error': 'Hashes, cert_ids or a ZIP file required'}), 400
+        if len(hashes) + len(cert_ids) > max_items:
+            return jsonify({'error': f'At most {max_items} items per request'}), 400
+
+    ip_address = request.remote_addr
+    user_agent = request.headers.get('User-Agent', '')[:USER_AGENT_LENGTH]
+
+    def generate():
+        results = verify_pdf_batch(archive, members) if archive else verify_id_batch(hashes, cert_ids)
+        log_rows = []
+        for result, log_row in results:
+            record_verification('batch', result['status'])
+            if log_row:
+                log_row.update(ip_address=ip_address, user_agent=user_agent)
+                log_rows.append(log_row)
+            yield json.dumps(result) + '\n'
+
+        # One executemany insert for the whole batch
+        if log_rows:
+            try:
+                db.session.execute(insert(VerificationLog), log_rows)
+                record_verifications(log_rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception('Writing batch verification logs failed', extra={'event': 'verify_batch.log_failed'})
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@main.route('/api/analytics/verifications')
+@login_required
+def verification_analytics():
+    """
+    API endpoint for verification volume, tamper rate and top certificates.
+    Query params: start, end (ISO dates, default last 7 days), granularity
+    (hour|day), certificate_id, top. Reads rollup rows only.
+    """
+    if not current_user.is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    granularity = request.args.get('granularity', 'hour')
+    if granularity not in ('hour', 'day'):
+        return jsonify({'error': 'granularity must be hour or day'}), 400
+
+    try:
+        end = datetime.fromisoformat(request.args['end']) if request.args.get('end') else datetime.utcnow()
+        start = datetime.fromisoformat(request.args['start']) if request.args.get('start') else end - timedelta(days=7)
+    except ValueError:
+        return jsonify({'error': 'start and end must be ISO dates'}), 400
+
+    certificate_id = request.args.get('certificate_id', type=int)
+    top = min(request.args.get('top', 10, type=int), 100)
+
+    # Catch up on logs written since the writer thread last rolled up
+    update_rollups(batch_size=current_app.config['ROLLUP_BATCH_SIZE'],
+                   settle_seconds=current_app.config['ROLLUP_SETTLE_SECONDS'],
+                   max_batches=5)
+
+    series = get_verification_series(start, end, granularity=granularity, certificate_id=certificate_id)
+    totals = {status: sum(point[status] for point in series) for status in ('Valid', 'Invalid', 'Tampered')}
+    totals['total'] = sum(point['total'] for point in series)
+
+    return jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'granularity': granularity,
+        'series': series,
+        'totals': totals,
+        'tamper_rate': totals['Tampered'] / totals['total'] if totals['total'] else 0.0,
+        'top_certificates': [] if certificate_id else get_top_certificates(start, end, limit=top),
+        'rolled_up_to_log_id': get_rollup_watermark()
+    })
+
+
+@main.route('/api/certificates/roll/<roll_number>')
+@login_required
+def certificates_by_roll(roll_number):
+    """API endpoint listing every certificate issued to a roll number (indexed lookup)"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    certificates = Certificate.query.filter_by(roll_number=roll_number) \
+        .order_by(Certificate.issue_date.desc()).all()
+    return jsonify([{
+        'id': cert.id,
+        'cert_id': cert.cert_id,
+        'student_name': cert.student_name,
+        'course_name': cert.course_name,
+        'semester_info': cert.semester_info,
+        'result_date': cert.result_date.isoformat() if cert.result_date else None,
+        'issue_date': cert.issue_date.isoformat(),
+        'is_active': cert.is_active
+    } for cert in certificates])
+
+
+@main.route('/api/analytics/grades')
+@login_required
+def grade_analytics():
+    """API endpoint for grade distributions per subject code (query params: code, course)"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    return jsonify(get_grade_distribution(code=request.args.get('code') or None,
+                                          course_name=request.args.get('course') or None))
+
+
+@main.route('/api/verify/cache')
+@login_required
+def verification_cache_status():
+    """API endpoint for verification cache hit/miss statistics"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    return jsonify(verification_cache.stats())
+
+
+@main.route('/api/verify/log-buffer')
+@login_required
+def verification_log_buffer_status():
+    """API endpoint for buffered verification log writer statistics"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    return jsonify(log_buffer.stats())
+
+
+@main.route('/api/timing/stages')
+@login_required
+def stage_timing_status():
+    """API endpoint for per-endpoint stage durations (SERVER_TIMING or debug mode)"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    return jsonify(stage_stats.stats())
+
+
+@main.route('/api/profiles')
+@login_required
+def profile_list():
+    """API endpoint listing request profiles written by the sampling profiler"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    return jsonify({
+        'enabled': profiler.enabled,
+        'mode': profiler.mode,
+        'sample_rate': profiler.sample_rate,
+        'endpoints': sorted(profiler.endpoints),
+        'profiles': [dict(profile, url=url_for('main.profile_download', name=profile['name']))
+                     for profile in profiler.list_profiles()]
+    })
+
+
+@main.route('/api/profiles/<name>')
+@login_required
+def profile_download(name):
+    """Download one .pstats or .collapsed profile"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+    if not name.endswith(RequestProfiler.EXTENSIONS):
+        abort(404)
+
+    return send_from_directory(os.path.abspath(profiler.folder), name, as_attachment=True)
+
+
 # Error handlers
-@app.errorhandler(404)
+@main.app_errorhandler(404)
 def not_found(error):
     return render_template('error.html', error_code=404, error_message='Page not found'), 404
 
 
-@app.errorhandler(500)
+@main.app_errorhandler(500)
 def internal_error(error):
     db.session.rollback()
     return render_template('error.html', error_code=500, error_message='Internal server error'), 500
 
 
+def register_commands(app):
+    """`flask init-db` and `flask create-admin`: the explicit setup steps for a deployment"""
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create tables and apply pending schema migrations."""
+        upgrade_schema()
+
+    @app.cli.command('create-admin')
+    @click.option('--username', default='admin', show_default=True)
+    @click.option('--email', default='admin@certificateverifier.com', show_default=True)
+    @click.option('--password', envvar='ADMIN_PASSWORD', default='admin123',
+                  help='Defaults to $ADMIN_PASSWORD, then admin123')
+    def create_admin_command(username, email, password):
+        """Create the admin account if it does not exist."""
+        if bootstrap_admin(username, email, password):
+            print(f"✓ Admin created: {username}")
+        else:
+            print(f"✓ A user named {username} or with email {email} already exists")
+
+
+def create_app(config_object=Config):
+    """
+    Build the Flask app. This does not touch the database, the ledger file or
+    the upload folders: schema setup and the first admin are `flask init-db`
+    and `flask create-admin`, the ledger loads on first use (or in the
+    background, see warmup) and folders are created when a certificate is
+    written.
+    """
+    app = Flask(__name__)
+    # Add ProxyFix for proper URL generation behind proxies (like Nginx/PythonAnywhere)
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
+    app.config.from_object(config_object)
+
+    # Initialize extensions
+    mail.init_app(app)
+    init_db(app)
+    init_query_counter(app)
+    init_stage_timing(app)
+    init_metrics(app)
+    init_logging(app)
+
+    verification_cache.max_entries = app.config['VERIFICATION_CACHE_SIZE']
+    verification_cache.ttl_seconds = app.config['VERIFICATION_CACHE_TTL']
+    listing_cache.max_entries = 64
+    listing_cache.ttl_seconds = app.config['LISTING_CACHE_TTL']
+    log_buffer.init_app(app)
+    warmup.init_app(app)
+    profiler.init_app(app)
+
+    app.register_blueprint(main)
+    register_commands(app)
+    return app
+
+
 def create_tables():
-    """Create database tables and initial admin user"""
+    """Apply schema migrations and create the initial admin user"""
     with app.app_context():
-        from sqlalchemy import inspect, text
+        upgrade_schema()
+        if bootstrap_admin():
+            print("✅ Default admin user created: username='admin', password='admin123'")
 
-        inspector = inspect(db.engine)
-        if 'certificates' in inspector.get_table_names():
-            columns = [col['name'] for col in inspector.get_columns('certificates')]
-            if 'marksheet_data' not in columns:
-                try:
-                    db.session.execute(text('ALTER TABLE certificates ADD COLUMN marksheet_data TEXT'))
-                    db.session.commit()
-                    print("✓ Added marksheet_data column")
-                except Exception:
-                    pass
-
-        db.create_all()
 
-        try:
-            admin = User.query.filter_by(username='admin').first()
-            if not admin:
-                admin = User(
-                    username='admin',
-                    email='admin@bctproject.com',
-                    role='admin'
-                )
-                admin.set_password('admin123')
-                db.session.add(admin)
-                db.session.commit()
-                print("✅ Default admin user created: username='admin', password='admin123'")
-        except Exception as e:
-            print(f"Database schema issue detected: {e}")
-            print("Recreating database...")
-            db.drop_all()
-            db.create_all()
-            admin = User(
-                username='admin',
-                email='admin@bctproject.com',
-                role='admin'
-            )
-            admin.set_password('admin123')
-            db.session.add(admin)
-            db.session.commit()
-            print("✅ Database recreated. Default admin user created: username='admin', password='admin123'")
+# WSGI entry point (gunicorn app:app)
+app = create_app()
 
 
 if __name__ == '__main__':
@@ -1407,4 +1974,9 @@ if __name__ == '__main__':
     print("🔐 Login credentials: admin / admin123")
     print("="*50 + "\n")
 
+    # app.run(debug=True) only turns debug on after create_app, so enable the debug-mode hooks here
+    app.debug = True
+    init_query_counter(app)
+    init_stage_timing(app)
+
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
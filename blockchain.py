@@ -2,9 +2,13 @@
 
 import hashlib
 import json
+import logging
 import os
+import threading
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 class Block:
     """
     Represents a single block in the blockchain.
@@ -39,6 +43,14 @@ class Block:
             'hash': self.hash
         }
     
+    def get_data(self):
+        """Parse the JSON issuance record stored in the block, or None for plain hashes"""
+        try:
+            block_data = json.loads(self.certificate_hash)
+        except (TypeError, ValueError):
+            return None
+        return block_data if isinstance(block_data, dict) else None
+
     @classmethod
     def from_dict(cls, data):
         """Create block from dictionary"""
@@ -52,13 +64,20 @@ class Blockchain:
     """
     Blockchain to store certificate hashes in a tamper-proof way.
     Supports persistence to JSON file.
+    Lookups by certificate hash, PDF hash and cert_id go through dict indexes
+    that are built on first use (or by build_index) and kept up to date by
+    add_block.
     """
-    def __init__(self, persist_file=None):
+    def __init__(self, persist_file=None, progress=None):
         self.chain = []
         self.persist_file = persist_file
+        self.validated_height = 0  # Blocks [0, validated_height) already passed is_chain_valid
+        self._blocks_by_hash = None  # certificate_hash / pdf_hash -> first block holding it
+        self._records_by_cert_id = None  # cert_id -> (first block, issuance record)
+        self._index_lock = threading.Lock()
         self.create_genesis_block()
         if persist_file and os.path.exists(persist_file):
-            self.load_from_file()
+            self.load_from_file(progress=progress)
 
     def create_genesis_block(self):
         """
@@ -72,6 +91,12 @@ class Blockchain:
     def last_block(self):
         return self.chain[-1] if self.chain else None
 
+    def get_block_by_index(self, index):
+        """Get block at a given index, or None if out of range"""
+        if index is None or index < 0 or index >= len(self.chain):
+            return None
+        return self.chain[index]
+
     def add_block(self, certificate_hash):
         """
         Adds a new block containing the certificate hash to the blockchain.
@@ -83,6 +108,9 @@ class Blockchain:
         previous_hash = self.last_block.hash
         new_block = Block(len(self.chain), certificate_hash, previous_hash)
         self.chain.append(new_block)
+        with self._index_lock:  # Waits for a build_index in progress
+            if self._blocks_by_hash is not None:
+                self._index_block(new_block, self._blocks_by_hash, self._records_by_cert_id)
         
         # Persist to file if configured
         if self.persist_file:
@@ -90,55 +118,92 @@ class Blockchain:
         
         return new_block
 
+    @staticmethod
+    def _index_block(block, blocks_by_hash, records_by_cert_id):
+        """Add one block to the lookup indexes; earlier blocks keep precedence"""
+        blocks_by_hash.setdefault(block.certificate_hash, block)
+        block_data = block.get_data()
+        if block_data is None:
+            return
+        pdf_hash = block_data.get('pdf_hash')
+        if pdf_hash is not None:
+            blocks_by_hash.setdefault(pdf_hash, block)
+        cert_id = block_data.get('cert_id')
+        if cert_id is not None:
+            records_by_cert_id.setdefault(cert_id, (block, block_data))
+
+    def build_index(self, progress=None):
+        """
+        Build the hash and cert_id lookup indexes in one pass over the chain.
+        progress(done, total) is called every 10,000 blocks and at the end.
+        """
+        with self._index_lock:
+            if self._blocks_by_hash is None:
+                blocks_by_hash = {}
+                records_by_cert_id = {}
+                total = len(self.chain)
+                for position, block in enumerate(self.chain, 1):
+                    self._index_block(block, blocks_by_hash, records_by_cert_id)
+                    if progress and position % 10000 == 0:
+                        progress(position, total)
+                # Publish both at once; readers check _blocks_by_hash first
+                self._records_by_cert_id = records_by_cert_id
+                self._blocks_by_hash = blocks_by_hash
+        if progress:
+            progress(len(self.chain), len(self.chain))
+
+    @property
+    def is_indexed(self):
+        return self._blocks_by_hash is not None
+
     def verify_certificate(self, certificate_hash):
         """
         Verifies if a certificate hash exists in the blockchain.
         Returns block index if found, else None.
         """
-        for block in self.chain:
-            if block.certificate_hash == certificate_hash:
-                return block.index
-            # Also check if hash is in JSON data
-            try:
-                import json
-                block_data = json.loads(block.certificate_hash)
-                if block_data.get('pdf_hash') == certificate_hash:
-                    return block.index
-            except:
-                pass
-        return None
+        block = self.get_block_by_hash(certificate_hash)
+        return block.index if block else None
 
     def get_block_by_hash(self, certificate_hash):
-        """Get block containing the certificate hash"""
-        for block in self.chain:
-            if block.certificate_hash == certificate_hash:
-                return block
-            # Also check if hash is in JSON data
-            try:
-                import json
-                block_data = json.loads(block.certificate_hash)
-                if block_data.get('pdf_hash') == certificate_hash:
-                    return block
-            except:
-                pass
-        return None
+        """Get the first block holding the certificate hash (raw or as pdf_hash in its JSON data)"""
+        if self._blocks_by_hash is None:
+            self.build_index()
+        return self._blocks_by_hash.get(certificate_hash)
     
+    def find_blocks(self, hashes=(), cert_ids=()):
+        """
+        Resolves many certificate hashes and certificate IDs at once.
+        Returns (blocks_by_hash, records_by_cert_id) where the latter maps
+        cert_id -> (block, issuance record). First match wins, as in
+        get_block_by_hash.
+        """
+        if self._blocks_by_hash is None:
+            self.build_index()
+        blocks_by_hash = {h: self._blocks_by_hash[h] for h in set(hashes) if h in self._blocks_by_hash}
+        records_by_cert_id = {c: self._records_by_cert_id[c] for c in set(cert_ids) if c in self._records_by_cert_id}
+        return blocks_by_hash, records_by_cert_id
+
+    def get_record_by_cert_id(self, cert_id):
+        """
+        Get the issuance record (cert_id, pdf_hash and, for newer blocks,
+        pdf_size) stored in the blockchain for a certificate ID.
+        """
+        if self._blocks_by_hash is None:
+            self.build_index()
+        entry = self._records_by_cert_id.get(cert_id)
+        return dict(entry[1]) if entry else None
+
     def get_hash_by_cert_id(self, cert_id):
         """Get PDF hash from blockchain by certificate ID"""
-        import json
-        for block in self.chain:
-            try:
-                block_data = json.loads(block.certificate_hash)
-                if block_data.get('cert_id') == cert_id:
-                    return block_data.get('pdf_hash')
-            except:
-                pass
-        return None
-
-    def is_chain_valid(self):
+        record = self.get_record_by_cert_id(cert_id)
+        return record.get('pdf_hash') if record else None
+
+    def is_chain_valid(self, full=False):
         """
         Validates the integrity of the blockchain.
         Returns True if the chain is valid, else False.
+        Blocks already validated since the chain was loaded are skipped;
+        pass full=True to re-check every block.
         """
         if len(self.chain) == 0:
             return False
@@ -146,7 +211,8 @@ class Blockchain:
         if len(self.chain) == 1:
             return True
         
-        for i in range(1, len(self.chain)):
+        start = 1 if full else max(1, self.validated_height)
+        for i in range(start, len(self.chain)):
             current = self.chain[i]
             previous = self.chain[i - 1]
 
@@ -158,6 +224,7 @@ class Blockchain:
             if current.previous_hash != previous.hash:
                 return False
 
+        self.validated_height = len(self.chain)
         return True
     
     def get_chain_info(self):
@@ -178,11 +245,14 @@ class Blockchain:
             chain_data = [block.to_dict() for block in self.chain]
             with open(self.persist_file, 'w') as f:
                 json.dump(chain_data, f, indent=2, default=str)
-        except Exception as e:
-            print(f"Error saving blockchain: {e}")
+        except Exception:
+            logger.exception('Saving the ledger file failed')
     
-    def load_from_file(self):
-        """Load blockchain from JSON file"""
+    def load_from_file(self, progress=None):
+        """
+        Load blockchain from JSON file.
+        progress(done, total) is called every 10,000 blocks and at the end.
+        """
         if not self.persist_file or not os.path.exists(self.persist_file):
             return
         
@@ -191,10 +261,19 @@ class Blockchain:
                 chain_data = json.load(f)
             
             self.chain = []
-            for block_data in chain_data:
+            self.validated_height = 0
+            self._blocks_by_hash = self._records_by_cert_id = None
+            total = len(chain_data)
+            for position, block_data in enumerate(chain_data, 1):
                 block = Block.from_dict(block_data)
                 self.chain.append(block)
-        except Exception as e:
-            print(f"Error loading blockchain: {e}")
+                if progress and position % 10000 == 0:
+                    progress(position, total)
+            if progress:
+                progress(total, total)
+        except Exception:
+            logger.exception('Loading the ledger file failed; starting a new chain')
             self.chain = []
+            self.validated_height = 0
+            self._blocks_by_hash = self._records_by_cert_id = None
             self.create_genesis_block()
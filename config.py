@@ -1,4 +1,5 @@
 # config.py
+import json
 import os
 from dotenv import load_dotenv
 
@@ -13,9 +14,26 @@ class Config:
     
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///bct_project.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Extra create_engine() options as JSON, e.g. '{"pool_size": 20}'; these override the profile below
+    SQLALCHEMY_ENGINE_OPTIONS = json.loads(os.getenv('SQLALCHEMY_ENGINE_OPTIONS', '{}'))
+
+    # SQLite profile, applied to every connection (see utils/engine.py)
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')  # WAL lets readers run alongside a writer
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')  # Safe with WAL; fsyncs at checkpoints only
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))  # Wait for the write lock instead of "database is locked"
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # Bytes of the file read through mmap
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024))  # Page cache per connection
+
+    # Connection pool for server databases (Postgres/MySQL)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))  # Connections kept open per worker
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))  # Extra connections under burst load
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # Reconnect after this many seconds
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'  # Drop dead connections before use
     
     # File upload configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    HASH_CHUNK_SIZE = int(os.getenv('HASH_CHUNK_SIZE', 64 * 1024))  # Bytes read per hash update
     UPLOAD_FOLDER = 'certificates'
     QR_FOLDER = 'static/qr'
     
@@ -24,9 +42,68 @@ class Config:
     
     # Pagination
     CERTIFICATES_PER_PAGE = 10
+
+    # Admin search uses SQLite FTS5 / Postgres tsvector when available, LIKE otherwise
+    FULL_TEXT_SEARCH = os.getenv('FULL_TEXT_SEARCH', 'True').lower() == 'true'
     
     # Blockchain configuration
-    BLOCKCHAIN_FILE = 'blockchain_data.json'  # Optional: persist blockchain to file
+    BLOCKCHAIN_FILE = os.getenv('BLOCKCHAIN_FILE', 'blockchain_data.json')  # Optional: persist blockchain to file
+    WARMUP_RETRY_INTERVAL = float(os.getenv('WARMUP_RETRY_INTERVAL', 30))  # Seconds before a failed ledger/cache warm-up is retried
+
+    # Logged-in user snapshots (per worker process); a deactivated user keeps access for at most USER_CACHE_TTL
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1024))  # Max cached users, 0 disables
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))  # Seconds before a user row is re-read
+
+    # Per-request SQL statement counter (always on in debug mode)
+    QUERY_COUNTER = os.getenv('QUERY_COUNTER', 'False').lower() == 'true'
+    QUERY_COUNT_WARN = int(os.getenv('QUERY_COUNT_WARN', 20))  # Requests above this are printed
+
+    # Per-stage Server-Timing header on issuance and verification (always on in debug mode)
+    SERVER_TIMING = os.getenv('SERVER_TIMING', 'False').lower() == 'true'
+
+    # Prometheus /metrics; under gunicorn workers are merged via PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py)
+    # Served to logged-in admins, or to scrapers sending "Authorization: Bearer <METRICS_TOKEN>"
+    # (Prometheus: authorization.credentials); with no token set, only admins can read it.
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+    # Structured JSON logs on stdout, written by a background thread
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')  # DEBUG adds per-certificate issuance detail
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # Records held before new ones are dropped
+
+    # Request profiler (admin: /api/profiles); off unless PROFILE_SAMPLE_RATE > 0
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))  # Fraction of requests profiled, e.g. 0.01
+    PROFILE_ENDPOINTS = os.getenv('PROFILE_ENDPOINTS', '')  # Comma-separated endpoints to restrict to, e.g. verify_upload
+    PROFILE_MODE = os.getenv('PROFILE_MODE', 'cprofile')  # 'cprofile' (.pstats) or 'sample' (.collapsed stacks)
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', 0.005))  # Seconds between stack samples
+    PROFILE_FOLDER = os.getenv('PROFILE_FOLDER', 'profiles')
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 200))  # Oldest profiles beyond this are deleted
+
+    # Verification result cache (per worker process)
+    VERIFICATION_CACHE_SIZE = int(os.getenv('VERIFICATION_CACHE_SIZE', 4096))  # Max cached results, 0 disables
+    VERIFICATION_CACHE_TTL = int(os.getenv('VERIFICATION_CACHE_TTL', 300))  # Seconds before a result is recomputed
+    LISTING_CACHE_TTL = int(os.getenv('LISTING_CACHE_TTL', 300))  # Seconds to keep admin course facets / student counts
+
+    # Batch verification API
+    BATCH_VERIFY_MAX_ITEMS = int(os.getenv('BATCH_VERIFY_MAX_ITEMS', 500))  # Hashes, cert_ids or PDFs per request
+    BATCH_VERIFY_WORKERS = int(os.getenv('BATCH_VERIFY_WORKERS', 4))  # Threads hashing PDFs from a ZIP
+    BATCH_VERIFY_MAX_BYTES = int(os.getenv('BATCH_VERIFY_MAX_BYTES', MAX_CONTENT_LENGTH))  # Total uncompressed PDF bytes per ZIP
+
+    # Buffered verification log writer
+    LOG_BUFFER_MAX_QUEUE = int(os.getenv('LOG_BUFFER_MAX_QUEUE', 10000))  # Records held before the drop policy applies
+    LOG_BUFFER_FLUSH_SIZE = int(os.getenv('LOG_BUFFER_FLUSH_SIZE', 200))  # Records per bulk insert
+    LOG_BUFFER_FLUSH_INTERVAL = float(os.getenv('LOG_BUFFER_FLUSH_INTERVAL', 2.0))  # Seconds between flushes
+    LOG_BUFFER_POLICY = os.getenv('LOG_BUFFER_POLICY', 'drop_newest')  # 'drop_newest' or 'drop_oldest'
+
+    # Verification analytics rollups
+    ROLLUP_INTERVAL = float(os.getenv('ROLLUP_INTERVAL', 60))  # Seconds between rollup runs in the log writer, 0 disables
+    ROLLUP_BATCH_SIZE = int(os.getenv('ROLLUP_BATCH_SIZE', 5000))  # Log rows folded per transaction
+    ROLLUP_SETTLE_SECONDS = int(os.getenv('ROLLUP_SETTLE_SECONDS', 5))  # Logs inserted more recently than this wait for the next run
+
+    # Verification log retention (see scripts/verification_logs.py)
+    LOG_RETENTION_DAYS = int(os.getenv('LOG_RETENTION_DAYS', 90))  # Rows older than this are archived
+    LOG_ARCHIVE_FOLDER = os.getenv('LOG_ARCHIVE_FOLDER', 'archives')  # Date-partitioned .jsonl.gz files
+    LOG_ARCHIVE_BATCH_SIZE = int(os.getenv('LOG_ARCHIVE_BATCH_SIZE', 1000))  # Rows deleted per transaction
 
     # Mail Configuration
     MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
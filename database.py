@@ -1,22 +1,83 @@
 # database.py
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from utils.cache import TTLCache
 
 # Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
 
+# Identity/role snapshots for load_user, per worker process. Writes to a user
+# drop its entry in this worker; the TTL bounds staleness in the others.
+user_cache = TTLCache(max_entries=0)
+
+# Columns copied into the cached snapshot (everything current_user is read for)
+USER_SNAPSHOT_COLUMNS = ('id', 'username', 'email', 'role', 'created_at', 'is_active')
+
+
+def invalidate_cached_user(user_id):
+    """Forget a user's cached snapshot in this worker"""
+    user_cache.invalidate(user_id)
+
+
+def _user_changed(mapper, connection, target):
+    invalidate_cached_user(target.id)
+    # Drop it again at commit, in case a concurrent request re-cached the old row in between
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_user_ids', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_users(session):
+    for user_id in session.info.pop('changed_user_ids', ()):
+        invalidate_cached_user(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_users(session):
+    session.info.pop('changed_user_ids', None)
+
+
 def init_db(app):
     """Initialize database and login manager with Flask app"""
+    from utils.engine import build_engine_options, install_sqlite_pragmas
+
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config)
     db.init_app(app)
+    with app.app_context():
+        install_sqlite_pragmas(db.engine, app.config)
     login_manager.init_app(app)
-    login_manager.login_view = 'login'
+    login_manager.login_view = 'main.login'
     login_manager.login_message = 'Please log in to access this page.'
     login_manager.login_message_category = 'info'
     
     # User loader for Flask-Login
     from models.user_model import User
+
+    user_cache.max_entries = app.config['USER_CACHE_SIZE']
+    user_cache.ttl_seconds = app.config['USER_CACHE_TTL']
+    for identifier in ('after_update', 'after_delete'):
+        if not event.contains(User, identifier, _user_changed):
+            event.listen(User, identifier, _user_changed)
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        """
+        Return current_user from a cached snapshot (no query on a hit).
+        The result is a transient User: columns are readable, but it is not
+        attached to the session, so load the row explicitly before changing it.
+        Deactivated or deleted users get None, i.e. are logged out.
+        """
+        user_id = int(user_id)
+        snapshot = user_cache.get(user_id)
+        if snapshot is None:
+            user = db.session.get(User, user_id)
+            if user is None or not user.is_active:
+                return None
+            snapshot = {column: getattr(user, column) for column in USER_SNAPSHOT_COLUMNS}
+            user_cache.set(user_id, snapshot)
+        return User(**snapshot)
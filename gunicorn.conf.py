@@ -0,0 +1,58 @@
+# gunicorn.conf.py
+# Read automatically by `gunicorn app:app` from the project directory.
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# One worker unless WEB_CONCURRENCY says otherwise: every process holds its own
+# in-memory ledger and rewrites blockchain_data.json from it on each append, so
+# several workers would miss each other's certificates and overwrite each other's
+# blocks on disk. Keep this at 1 until ledger appends are serialized across
+# processes (file lock + reload before append).
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+
+# Workers write Prometheus metrics to files here and /metrics merges them.
+# This must be set before the app (and prometheus_client) is imported, and
+# the directory is emptied on every server start so old counters do not leak.
+metrics_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), f"certificate-metrics-{os.getenv('PORT', '8000')}"))
+shutil.rmtree(metrics_dir, ignore_errors=True)
+os.makedirs(metrics_dir, exist_ok=True)
+
+# Import the app once in the master and fork workers from it, so module
+# imports and the parsed ledger are shared copy-on-write instead of being
+# rebuilt in every worker.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+
+def when_ready(server):
+    """Load and index the ledger in the master before the first worker is forked"""
+    if not preload_app:
+        return
+    from app import app, get_blockchain
+    blockchain = get_blockchain(app)
+    blockchain.build_index()
+    server.log.info(f"Ledger loaded in master: {len(blockchain.chain)} blocks")
+
+
+def post_fork(server, worker):
+    """Workers must not reuse database connections opened before the fork"""
+    if not preload_app:
+        return
+    from app import app
+    from database import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Warm the worker up in the background; /health reports ready when done"""
+    from app import warmup
+    warmup.start()
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges (its counters and histograms are kept)"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,58 +1,42 @@
 # init_db.py
-from app import app, db
+from app import app, db, blockchain
+from utils.migrations import SCHEMA_VERSION, backfill_cert_ids, backfill_marksheet_fields, get_schema_version, run_migrations
+from utils.search import rebuild_search_index
 from models import User, Certificate, VerificationLog
-from sqlalchemy import inspect, text
 
 def init_database():
     """Initialize database and create default admin user"""
     with app.app_context():
-        # Check if marksheet_data column exists in certificates table
-        inspector = inspect(db.engine)
-        needs_update = False
+        # Create missing tables and apply pending migrations (never drops data)
+        applied = run_migrations(blockchain)
+        if applied:
+            print(f"✓ Applied migrations {applied}")
+        print(f"✓ Database schema at version {get_schema_version()} (latest {SCHEMA_VERSION})")
         
-        if 'certificates' in inspector.get_table_names():
-            columns = [col['name'] for col in inspector.get_columns('certificates')]
-            if 'marksheet_data' not in columns:
-                print("Adding marksheet_data column to certificates table...")
-                try:
-                    db.session.execute(text('ALTER TABLE certificates ADD COLUMN marksheet_data TEXT'))
-                    db.session.commit()
-                    print("✓ Column added successfully!")
-                    needs_update = True
-                except Exception as e:
-                    print(f"Error adding column: {e}")
-                    print("Dropping and recreating tables...")
-                    db.drop_all()
-                    db.create_all()
-                    print("✓ Database tables recreated!")
-                    needs_update = True
-        else:
-            # Tables don't exist, create them
-            db.create_all()
-            print("✓ Database tables created successfully!")
-            needs_update = True
+        # Link certificates to the cert_id recorded in their blockchain block
+        try:
+            updated = backfill_cert_ids(blockchain)
+            print(f"✓ cert_id backfilled for {updated} certificate(s)")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Note: Could not backfill cert_id: {e}")
+
+        # Copy roll number, semester, result date and subjects out of marksheet JSON
+        try:
+            updated = backfill_marksheet_fields()
+            print(f"✓ Marksheet fields backfilled for {updated} certificate(s)")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Note: Could not backfill marksheet fields: {e}")
         
-        if not needs_update:
-            # Double check by inspecting columns
-            inspector = inspect(db.engine)
-            if 'certificates' in inspector.get_table_names():
-                columns = [col['name'] for col in inspector.get_columns('certificates')]
-                if 'marksheet_data' not in columns:
-                    print("marksheet_data column missing, adding it...")
-                    try:
-                        db.session.execute(text('ALTER TABLE certificates ADD COLUMN marksheet_data TEXT'))
-                        db.session.commit()
-                        print("✓ Column added!")
-                    except Exception as e:
-                        print(f"Error: {e}, recreating database...")
-                        db.drop_all()
-                        db.create_all()
-                        print("✓ Database recreated!")
-                else:
-                    print("✓ Database schema is up to date")
-            else:
-                db.create_all()
-                print("✓ Database tables created!")
+        # Re-sync the admin full-text search index
+        if app.config['FULL_TEXT_SEARCH']:
+            try:
+                rebuild_search_index()
+                print("✓ Search index rebuilt")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Note: Could not rebuild search index: {e}")
         
         # Create default admin user if not exists
         admin = User.query.filter_by(username='admin').first()
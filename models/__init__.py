@@ -2,4 +2,8 @@
 
 from .user_model import User
 from .certificate_model import Certificate
+from .certificate_subject_model import CertificateSubject
 from .verification_log_model import VerificationLog
+from .daily_stats_model import DailyStats
+from .verification_rollup_model import VerificationRollup, RollupState
+from .schema_migration_model import SchemaMigration
@@ -3,11 +3,34 @@ from database import db
 from datetime import datetime
 import json
 
+from .certificate_subject_model import CertificateSubject
+
+# Formats accepted for the marksheet's result_date (issue form, batch CSV)
+RESULT_DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d.%m.%Y')
+
+
+def parse_result_date(value):
+    """Parse a marksheet result date string, or None if it is missing or malformed"""
+    if not value:
+        return None
+    for fmt in RESULT_DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
 class Certificate(db.Model):
     """Certificate model to store certificate/marksheet information"""
     __tablename__ = 'certificates'
+    __table_args__ = (
+        db.Index('ix_certificates_student_issue', 'student_id', 'issue_date'),  # Student dashboard
+        db.Index('ix_certificates_course_issue', 'course_name', 'issue_date'),  # Course-filtered listing
+    )
 
     id = db.Column(db.Integer, primary_key=True)
+    cert_id = db.Column(db.String(100), unique=True, nullable=True, index=True)  # Public ID printed in the QR code (roll_timestamp_suffix)
     student_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # Link to student user
     student_name = db.Column(db.String(150), nullable=False, index=True)
     course_name = db.Column(db.String(150), nullable=False, index=True)
@@ -21,9 +44,17 @@ class Certificate(db.Model):
     
     # Marksheet specific fields (stored as JSON for flexibility)
     marksheet_data = db.Column(db.Text, nullable=True)  # JSON string with all marksheet details
+
+    # Hot marksheet fields copied out of marksheet_data so they can be filtered on
+    roll_number = db.Column(db.String(50), nullable=True, index=True)
+    college_id = db.Column(db.String(50), nullable=True, index=True)
+    semester_info = db.Column(db.String(150), nullable=True, index=True)
+    result_date = db.Column(db.Date, nullable=True, index=True)
     
     # Relationships
     verification_logs = db.relationship('VerificationLog', backref='certificate', lazy=True, cascade='all, delete-orphan')
+    subjects = db.relationship('CertificateSubject', backref='certificate', lazy=True, cascade='all, delete-orphan',
+                               order_by='CertificateSubject.position')
     
     def get_marksheet_data(self):
         """Get marksheet data as dictionary"""
@@ -32,8 +63,25 @@ class Certificate(db.Model):
         return {}
     
     def set_marksheet_data(self, data):
-        """Set marksheet data from dictionary"""
+        """Set marksheet data from dictionary, keeping the indexed columns and subject rows in step"""
         self.marksheet_data = json.dumps(data) if data else None
+        self.sync_marksheet_fields(data or {})
+
+    def sync_marksheet_fields(self, data):
+        """Copy roll number, college, semester, result date and subjects out of a marksheet dict"""
+        def text(key, length):
+            value = data.get(key)
+            if value is None:
+                return None
+            return str(value).strip()[:length] or None
+
+        self.roll_number = text('roll_number', 50)
+        self.college_id = text('college_id', 50)
+        self.semester_info = text('semester_info', 150)
+        self.result_date = parse_result_date(data.get('result_date'))
+        self.subjects = [CertificateSubject.from_dict(subject, position)
+                         for position, subject in enumerate(data.get('subjects') or [])
+                         if isinstance(subject, dict)]
     
     def __repr__(self):
         return f'<Certificate {self.student_name} - {self.course_name}>'
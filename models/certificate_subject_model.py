@@ -0,0 +1,40 @@
+# models/certificate_subject_model.py
+from database import db
+
+
+class CertificateSubject(db.Model):
+    """One subject row of a marksheet, normalized out of Certificate.marksheet_data"""
+    __tablename__ = 'certificate_subjects'
+    __table_args__ = (
+        db.Index('ix_certificate_subjects_code_grade', 'code', 'grade'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    certificate_id = db.Column(db.Integer, db.ForeignKey('certificates.id', ondelete='CASCADE'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0)  # Order on the marksheet
+    code = db.Column(db.String(50), nullable=False)
+    subject_type = db.Column(db.String(50), nullable=True)
+    credits = db.Column(db.String(20), nullable=True)
+    grade = db.Column(db.String(20), nullable=True)
+    internal_marks = db.Column(db.String(20), nullable=True)
+    external_marks = db.Column(db.String(20), nullable=True)
+
+    @classmethod
+    def from_dict(cls, data, position=0):
+        """Build a row from a marksheet subject dict (code, type, credits, grade, ...)"""
+        def value(key, length):
+            raw = data.get(key)
+            return str(raw)[:length] if raw not in (None, '') else None
+
+        return cls(
+            position=position,
+            code=value('code', 50) or 'SUB',
+            subject_type=value('type', 50),
+            credits=value('credits', 20),
+            grade=value('grade', 20),
+            internal_marks=value('internal_marks', 20),
+            external_marks=value('external_marks', 20)
+        )
+
+    def __repr__(self):
+        return f'<CertificateSubject {self.code}: {self.grade}>'
@@ -0,0 +1,17 @@
+# models/daily_stats_model.py
+from database import db
+
+
+class DailyStats(db.Model):
+    """Per-day counters maintained at issuance and verification time for the dashboard"""
+    __tablename__ = 'daily_stats'
+
+    day = db.Column(db.Date, primary_key=True)  # Certificate issue_date / log verified_at day
+    certificates_issued = db.Column(db.Integer, nullable=False, default=0)
+    verifications_total = db.Column(db.Integer, nullable=False, default=0)
+    verifications_valid = db.Column(db.Integer, nullable=False, default=0)
+    verifications_invalid = db.Column(db.Integer, nullable=False, default=0)
+    verifications_tampered = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DailyStats {self.day}: {self.certificates_issued} issued, {self.verifications_total} verified>'
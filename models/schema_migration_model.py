@@ -0,0 +1,15 @@
+# models/schema_migration_model.py
+from database import db
+from datetime import datetime
+
+
+class SchemaMigration(db.Model):
+    """One applied schema migration (see utils/migrations.py)"""
+    __tablename__ = 'schema_migrations'
+
+    version = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(150), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<SchemaMigration {self.version}: {self.name}>'
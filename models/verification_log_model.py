@@ -5,6 +5,10 @@ from datetime import datetime
 class VerificationLog(db.Model):
     """Verification log model to track certificate verification attempts"""
     __tablename__ = 'verification_logs'
+    __table_args__ = (
+        db.Index('ix_verification_logs_verified_status', 'verified_at', 'status'),  # Dashboard / daily_stats rebuild
+        db.Index('ix_verification_logs_certificate_verified', 'certificate_id', 'verified_at'),  # Per-certificate history
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     certificate_id = db.Column(db.Integer, db.ForeignKey('certificates.id'), nullable=True)  # Nullable if hash not found
@@ -13,6 +17,8 @@ class VerificationLog(db.Model):
     status = db.Column(db.String(50), nullable=False)  # 'Valid' or 'Invalid'
     ip_address = db.Column(db.String(50), nullable=True)
     user_agent = db.Column(db.String(500), nullable=True)
+    # Insert time on the database clock; rollups settle on it (verified_at is when the row was queued)
+    logged_at = db.Column(db.DateTime, server_default=db.func.current_timestamp(), nullable=True)
     
     def __repr__(self):
         return f'<VerificationLog {self.status} - {self.verified_at}>'
\ No newline at end of file
@@ -0,0 +1,37 @@
+# models/verification_rollup_model.py
+from database import db
+from datetime import datetime
+
+
+class VerificationRollup(db.Model):
+    """Verification counts per hour/day bucket, status and certificate, folded from verification_logs"""
+    __tablename__ = 'verification_rollups'
+    __table_args__ = (
+        db.Index('ix_verification_rollups_bucket', 'granularity', 'bucket_start'),
+        db.Index('ix_verification_rollups_certificate', 'granularity', 'certificate_id', 'bucket_start'),
+        # One row per bucket key, so a duplicate fold fails instead of double-counting (NULL certificate as 0)
+        db.Index('uq_verification_rollups_key', 'granularity', 'bucket_start', 'status',
+                 db.func.coalesce(db.column('certificate_id'), 0), unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(10), nullable=False)  # 'hour' or 'day'
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(50), nullable=False)
+    certificate_id = db.Column(db.Integer, nullable=True)  # None when the hash matched no certificate
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<VerificationRollup {self.granularity} {self.bucket_start} {self.status}: {self.count}>'
+
+
+class RollupState(db.Model):
+    """High-water mark (last folded verification_logs.id) for each rollup"""
+    __tablename__ = 'rollup_state'
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_log_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<RollupState {self.name}: {self.last_log_id}>'
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""Benchmark concurrent readers and writers against the default and tuned SQLite profiles.
+
+Run with the virtualenv activated:
+    python scripts/bench_db_concurrency.py [--writers 4] [--readers 8] [--seconds 10] [--json]
+
+Each worker is a separate process (like gunicorn workers) with its own engine,
+working on a scratch database file. Writers insert and commit one
+verification-log-like row at a time; readers run the dashboard's "recent rows"
+query and a status aggregate. The "default" profile is a plain
+create_engine(); the "tuned" profile uses utils/engine.py (WAL,
+synchronous=NORMAL, busy_timeout, mmap, cache size).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Ensure project root is on sys.path so imports work when script is run from scripts/
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from config import Config
+from utils.engine import build_engine_options, install_sqlite_pragmas
+
+CREATE_TABLE = """CREATE TABLE IF NOT EXISTS bench_logs (
+    id INTEGER PRIMARY KEY, blockchain_hash VARCHAR(256), status VARCHAR(50), verified_at DATETIME)"""
+INSERT = "INSERT INTO bench_logs (blockchain_hash, status, verified_at) VALUES (:hash, :status, CURRENT_TIMESTAMP)"
+READS = ["SELECT id, blockchain_hash, status FROM bench_logs ORDER BY id DESC LIMIT 10",
+         "SELECT status, count(*) FROM bench_logs GROUP BY status"]
+
+
+def make_engine(profile, url):
+    config = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+    config['SQLALCHEMY_DATABASE_URI'] = url
+    if profile == 'default':
+        return create_engine(url)
+    engine = create_engine(url, **build_engine_options(config))
+    install_sqlite_pragmas(engine, config)
+    return engine
+
+
+def worker(args):
+    """Run one reader or writer until the deadline; returns (role, latencies, errors)"""
+    role, profile, url, deadline, seed = args
+    engine = make_engine(profile, url)
+    latencies = []
+    errors = 0
+    i = 0
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            with engine.connect() as connection:
+                if role == 'writer':
+                    connection.execute(text(INSERT), {'hash': f'{seed}-{i}', 'status': ('Valid', 'Invalid', 'Tampered')[i % 3]})
+                    connection.commit()
+                else:
+                    for statement in READS:
+                        connection.execute(text(statement)).fetchall()
+            latencies.append(time.perf_counter() - started)
+        except OperationalError:
+            # "database is locked" once the busy timeout runs out
+            errors += 1
+        i += 1
+    engine.dispose()
+    return role, latencies, errors
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_profile(profile, writers, readers, seconds, seed_rows):
+    directory = tempfile.mkdtemp(prefix=f'bench-{profile}-')
+    url = 'sqlite:///' + os.path.join(directory, 'bench.db')
+    engine = make_engine(profile, url)
+    with engine.begin() as connection:
+        connection.execute(text(CREATE_TABLE))
+        connection.execute(text(INSERT), [{'hash': f'seed-{i}', 'status': 'Valid'} for i in range(seed_rows)])
+    engine.dispose()
+
+    deadline = time.time() + seconds
+    jobs = [('writer', profile, url, deadline, f'w{n}') for n in range(writers)] + \
+           [('reader', profile, url, deadline, f'r{n}') for n in range(readers)]
+    with multiprocessing.Pool(len(jobs)) as pool:
+        results = pool.map(worker, jobs)
+
+    summary = {'profile': profile}
+    for role in ('writer', 'reader'):
+        latencies = [value for r, values, _ in results if r == role for value in values]
+        summary[role] = {
+            'ops': len(latencies),
+            'ops_per_sec': round(len(latencies) / seconds, 1),
+            'errors': sum(errors for r, _, errors in results if r == role),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        }
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed-rows', type=int, default=10000, help='Rows inserted before the run')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    summaries = [run_profile(profile, args.writers, args.readers, args.seconds, args.seed_rows)
+                 for profile in ('default', 'tuned')]
+
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s per profile")
+        print(f"{'profile':8} {'role':7} {'ops/s':>9} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for summary in summaries:
+            for role in ('writer', 'reader'):
+                stats = summary[role]
+                print(f"{summary['profile']:8} {role:7} {stats['ops_per_sec']:>9} {stats['errors']:>7} "
+                      f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""Benchmark certificate issuance end to end with a stand-in PDF renderer.
+
+Run with the virtualenv activated:
+    python scripts/bench_issuance.py [--rows 100,1000] [--single 20] [--render-ms 0]
+                                     [--pdf-kb 40] [--ledger-file] [--json]
+
+Drives /admin/batch-issue with generated CSVs (one batch per --rows entry) and
+/admin/issue --single times through the Flask test client, against a scratch
+SQLite database and upload folder. wkhtmltopdf is replaced by a fake renderer
+that sleeps --render-ms and writes --pdf-kb of bytes derived from the HTML
+(deterministic, so hashes are stable run over run). Per-stage times come from
+the routes' Server-Timing header: csv, users, render (template), pdf, hash,
+ledger, db and email. Pass --ledger-file to persist the ledger as production
+does (every append rewrites the JSON file). The renders column counts PDFs
+rendered: /admin/issue re-renders until the embedded hash converges, which
+it rarely does, so expect several per certificate.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Point the app at scratch storage before it is imported
+SCRATCH_DIR = tempfile.mkdtemp(prefix='bench-issuance-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(SCRATCH_DIR, 'bench.db')
+os.environ['BLOCKCHAIN_FILE'] = ''
+os.environ['SERVER_TIMING'] = 'True'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.pop('MAIL_USERNAME', None)  # Emails take the "mail not configured" path
+
+# Ensure project root is on sys.path so imports work when script is run from scripts/
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pdfkit
+
+STAGES = ['csv', 'users', 'render', 'pdf', 'hash', 'ledger', 'db', 'email']
+CSV_HEADER = ['Student Name', 'Student Email', 'Roll Number', 'Degree Name', 'Semester Info', 'Result Date', 'Subjects']
+
+
+class FakeRenderer:
+    """Stands in for pdfkit.from_string: fixed latency, bytes derived from the HTML"""
+    def __init__(self, latency_ms, size_kb):
+        self.latency = latency_ms / 1000.0
+        self.size = size_kb * 1024
+        self.calls = 0
+
+    def from_string(self, html, output_path, configuration=None, options=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        seed = hashlib.sha256(html.encode()).digest()
+        body = (seed * (self.size // len(seed) + 1))[:self.size]
+        with open(output_path, 'wb') as f:
+            f.write(b'%PDF-1.4\n' + body)
+        return True
+
+    def install(self):
+        pdfkit.from_string = self.from_string
+        pdfkit.configuration = lambda **kwargs: None
+
+
+def generate_csv(rows, offset):
+    """CSV with rows students; each has a new email, so batch issue creates their accounts"""
+    lines = [','.join(CSV_HEADER)]
+    for i in range(offset, offset + rows):
+        lines.append(','.join([
+            f'Student {i}', f'student{i}@bench.example', f'R{i:06d}', 'B.Tech (CSE)', 'FIFTH Semester',
+            '2025-12-20', f'CS{i % 7}01:Core:4:A:40:80;CS{i % 5}02:Lab:2:O:45:40'
+        ]))
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def parse_server_timing(header):
+    """'render;dur=1.2, pdf;dur=3.4' -> {'render': 1.2, 'pdf': 3.4}"""
+    timings = {}
+    for metric in (header or '').split(','):
+        name, _, params = metric.strip().partition(';')
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip() == 'dur':
+                timings[name] = float(value)
+    return timings
+
+
+def summarize(kind, rows, elapsed, timings, renders):
+    stages = {stage: round(timings.get(stage, 0.0), 1) for stage in STAGES}
+    accounted = sum(stages.values())
+    return {
+        'kind': kind,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(rows / elapsed, 1) if elapsed else None,
+        'pdf_renders': renders,
+        'stage_ms': stages,
+        'other_ms': round(max(0.0, elapsed * 1000 - accounted), 1)
+    }
+
+
+def run_batch(client, rows, offset, renderer):
+    data = {'csv_file': (io.BytesIO(generate_csv(rows, offset)), 'bench.csv')}
+    renders = renderer.calls
+    started = time.perf_counter()
+    response = client.post('/admin/batch-issue', data=data, content_type='multipart/form-data')
+    elapsed = time.perf_counter() - started
+    if response.status_code != 302 or 'admin/certificates' not in response.headers.get('Location', ''):
+        raise SystemExit(f"❌ batch of {rows} rows failed with {response.status_code}")
+    return summarize('batch', rows, elapsed, parse_server_timing(response.headers.get('Server-Timing')),
+                     renderer.calls - renders)
+
+
+def run_single(client, count, offset, renderer):
+    totals = {}
+    renders = renderer.calls
+    started = time.perf_counter()
+    for i in range(offset, offset + count):
+        response = client.post('/admin/issue', data={
+            'student_name': f'Single {i}', 'student_email': f'single{i}@bench.example', 'roll_number': f'S{i:06d}',
+            'degree_name': 'B.Tech (CSE)', 'result_date': '2025-12-20',
+            'subject_code[]': ['CS101', 'CS102'], 'subject_grade[]': ['A', 'O']
+        })
+        if response.status_code != 302:
+            raise SystemExit(f"❌ /admin/issue failed with {response.status_code}")
+        for stage, ms in parse_server_timing(response.headers.get('Server-Timing')).items():
+            totals[stage] = totals.get(stage, 0.0) + ms
+    return summarize('single', count, time.perf_counter() - started, totals, renderer.calls - renders)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='100,1000', help='Comma-separated batch sizes, e.g. 100,1000,10000')
+    parser.add_argument('--single', type=int, default=20, help='Certificates issued one by one via /admin/issue')
+    parser.add_argument('--render-ms', type=float, default=0.0, help='Fake renderer latency per PDF')
+    parser.add_argument('--pdf-kb', type=int, default=40, help='Size of each fake PDF')
+    parser.add_argument('--ledger-file', action='store_true', help='Persist the ledger to a JSON file on every append')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    if args.ledger_file:
+        os.environ['BLOCKCHAIN_FILE'] = os.path.join(SCRATCH_DIR, 'blockchain_data.json')
+
+    from app import app, bootstrap_admin, upgrade_schema
+
+    app.config['UPLOAD_FOLDER'] = os.path.join(SCRATCH_DIR, 'certificates')
+    app.config['QR_FOLDER'] = os.path.join(SCRATCH_DIR, 'qr')
+    renderer = FakeRenderer(args.render_ms, args.pdf_kb)
+    renderer.install()
+
+    with app.app_context():
+        upgrade_schema()
+        bootstrap_admin()
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+
+    results = []
+    offset = 0
+    for rows in [int(size) for size in args.rows.split(',') if size.strip()]:
+        if not args.json:
+            print(f"⏳ Batch of {rows} rows...", flush=True)
+        results.append(run_batch(client, rows, offset, renderer))
+        offset += rows
+    if args.single:
+        if not args.json:
+            print(f"⏳ {args.single} single issues...", flush=True)
+        results.append(run_single(client, args.single, offset, renderer))
+
+    if args.json:
+        print(json.dumps({
+            'render_ms': args.render_ms,
+            'pdf_kb': args.pdf_kb,
+            'ledger_file': args.ledger_file,
+            'results': results
+        }, indent=2))
+    else:
+        print(f"fake renderer: {args.render_ms:g} ms, {args.pdf_kb} KB per PDF; "
+              f"ledger file: {'yes' if args.ledger_file else 'no'}")
+        print(f"{'kind':6} {'rows':>6} {'rows/s':>8} {'renders':>8} " +
+              ' '.join(f"{stage + ' ms':>10}" for stage in STAGES) + f" {'other ms':>10}")
+        for result in results:
+            print(f"{result['kind']:6} {result['rows']:>6} {result['rows_per_sec']:>8} {result['pdf_renders']:>8} " +
+                  ' '.join(f"{result['stage_ms'][stage]:>10}" for stage in STAGES) + f" {result['other_ms']:>10}")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""Benchmark blockchain.py on synthetic ledgers of 10k, 100k and 1M blocks.
+
+Run with the virtualenv activated:
+    python scripts/bench_ledger.py [--sizes 10000,100000,1000000] [--lookups 1000]
+                                   [--output results.json] [--baseline previous.json]
+
+Blocks carry the issuance payload the app writes ({"cert_id", "pdf_hash",
+"pdf_size"}, sorted keys). Every size runs in its own process so peak RSS is
+per size. Measured: add_block (in memory; persisting rewrites the file, see
+save_to_file), lookup index build, verify_certificate hits and misses,
+get_hash_by_cert_id, is_chain_valid (full and incremental),
+save_to_file/load_from_file and memory. Results are printed as a table and
+written as JSON with --output; --baseline prints the change against an
+earlier JSON file.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Ensure project root is on sys.path so imports work when script is run from scripts/
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from blockchain import Block, Blockchain
+
+# Lower is better for every metric except these
+HIGHER_IS_BETTER = {'add_block_per_sec'}
+
+
+def rss_mb():
+    """Current resident set size (Linux), or peak RSS where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def payload(i):
+    """Issuance record in the format admin_issue / admin_batch_issue write"""
+    return json.dumps({
+        'cert_id': f"R{i:07d}_{1700000000 + i}",
+        'pdf_hash': hashlib.sha256(str(i).encode()).hexdigest(),
+        'pdf_size': 40000 + i % 5000
+    }, sort_keys=True)
+
+
+def synthesize(size):
+    """A valid chain of size blocks (genesis included)"""
+    blockchain = Blockchain()
+    chain = blockchain.chain
+    started = datetime(2024, 1, 1)
+    for i in range(1, size):
+        chain.append(Block(i, payload(i), chain[-1].hash, started + timedelta(seconds=i)))
+    return blockchain
+
+
+def per_op_us(func, args):
+    started = time.perf_counter()
+    for arg in args:
+        func(arg)
+    return (time.perf_counter() - started) / len(args) * 1e6
+
+
+def run_size(size, lookups, seed):
+    """Benchmark one ledger size; runs in a fresh process"""
+    rng = random.Random(seed)
+    result = {'size': size}
+    rss_before = rss_mb()
+
+    started = time.perf_counter()
+    blockchain = synthesize(size)
+    result['synthesize_s'] = round(time.perf_counter() - started, 3)
+    result['chain_rss_mb'] = round(rss_mb() - rss_before, 1)
+
+    # Lookups: the first one builds the hash/cert_id indexes
+    started = time.perf_counter()
+    blockchain.build_index()
+    result['build_index_s'] = round(time.perf_counter() - started, 3)
+    indices = [rng.randrange(1, size) for _ in range(lookups)]
+    hits = [json.loads(payload(i))['pdf_hash'] for i in indices]
+    misses = [hashlib.sha256(f"missing-{i}".encode()).hexdigest() for i in range(lookups)]
+    cert_ids = [json.loads(payload(i))['cert_id'] for i in indices]
+    result['verify_hit_us'] = round(per_op_us(blockchain.verify_certificate, hits), 2)
+    result['verify_miss_us'] = round(per_op_us(blockchain.verify_certificate, misses), 2)
+    result['get_hash_by_cert_id_us'] = round(per_op_us(blockchain.get_hash_by_cert_id, cert_ids), 2)
+
+    started = time.perf_counter()
+    valid = blockchain.is_chain_valid(full=True)
+    result['is_chain_valid_full_s'] = round(time.perf_counter() - started, 3)
+    started = time.perf_counter()
+    blockchain.is_chain_valid()
+    result['is_chain_valid_incremental_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    if not valid:
+        raise RuntimeError(f"synthesized chain of {size} blocks failed validation")
+
+    # Appends in memory (persist_file is None); keeps the index up to date
+    appends = max(1, min(lookups, 10000))
+    started = time.perf_counter()
+    for i in range(size, size + appends):
+        blockchain.add_block(payload(i))
+    elapsed = time.perf_counter() - started
+    result['add_block_us'] = round(elapsed / appends * 1e6, 2)
+    result['add_block_per_sec'] = round(appends / elapsed, 1)
+
+    # Persistence round trip
+    directory = tempfile.mkdtemp(prefix='bench-ledger-')
+    path = os.path.join(directory, 'blockchain_data.json')
+    blockchain.persist_file = path
+    started = time.perf_counter()
+    blockchain.save_to_file()
+    result['save_to_file_s'] = round(time.perf_counter() - started, 3)
+    result['file_mb'] = round(os.path.getsize(path) / 2 ** 20, 1)
+    expected_height = len(blockchain.chain)
+    del blockchain
+
+    started = time.perf_counter()
+    loaded = Blockchain(persist_file=path)
+    result['load_from_file_s'] = round(time.perf_counter() - started, 3)
+    if len(loaded.chain) != expected_height:
+        raise RuntimeError(f"loaded {len(loaded.chain)} blocks, saved {expected_height}")
+    os.remove(path)
+    os.rmdir(directory)
+
+    result['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return result
+
+
+def run_isolated(args):
+    size, lookups, seed = args
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(run_size, (size, lookups, seed))
+
+
+def compare(results, baseline):
+    """Print the relative change of every metric against a baseline run"""
+    previous = {entry['size']: entry for entry in baseline.get('results', [])}
+    print(f"\nChange vs baseline ({baseline.get('timestamp', '?')}); + is slower/bigger unless marked ↑")
+    for entry in results:
+        old = previous.get(entry['size'])
+        if not old:
+            continue
+        changes = []
+        for metric, value in entry.items():
+            if metric == 'size' or not isinstance(old.get(metric), (int, float)) or not old[metric]:
+                continue
+            change = (value - old[metric]) / old[metric] * 100
+            marker = '↑' if metric in HIGHER_IS_BETTER else ''
+            changes.append(f"{metric}{marker} {change:+.0f}%")
+        print(f"{entry['size']:>9}: " + ', '.join(changes))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='Comma-separated block counts')
+    parser.add_argument('--lookups', type=int, default=1000, help='Lookups and appends timed per size')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--baseline', help='Earlier --output file to compare against')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON instead of a table')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    results = []
+    for size in sizes:
+        if not args.json:
+            print(f"⏳ {size} blocks...", flush=True)
+        results.append(run_isolated((size, args.lookups, args.seed)))
+
+    report = {
+        'benchmark': 'ledger',
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'lookups': args.lookups,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        columns = [name for name in results[0] if name != 'size'] if results else []
+        for entry in results:
+            print(f"\n{entry['size']} blocks")
+            for name in columns:
+                print(f"  {name:32} {entry[name]:>12}")
+        if args.output:
+            print(f"\n✅ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
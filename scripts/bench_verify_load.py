@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+"""Load-test the public verification endpoints against a locally started gunicorn.
+
+Run with the virtualenv activated:
+    python scripts/bench_verify_load.py [--certificates 10000] [--workers 4] [--concurrency 16]
+                                        [--seconds 30] [--mix hash=4,cert_id=2,upload=1,qr=3]
+                                        [--miss 0.2] [--tampered 0.1] [--output results.json]
+
+Seeds a scratch database and ledger with --certificates issued certificates
+(blocks carry the {"cert_id", "pdf_hash", "pdf_size"} record the app writes),
+starts gunicorn on them with gunicorn.conf.py and waits for /health/ready.
+--concurrency client threads then send a seeded random mix of
+/verify?hash=, /verify?cert_id=, /verify_upload and /api/verify/qr requests
+for --seconds. A --miss fraction of requests asks for hashes or IDs that were
+never issued and a --tampered fraction uploads an issued certificate with
+bytes changed (half keep the size, half are truncated). Reports requests/sec,
+error rate and p50/p95/p99 latency per endpoint and overall. PDFs are
+synthetic, so nothing is rendered; the verification cache warms up during
+the run as it would in production.
+"""
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Ensure project root is on sys.path so imports work when script is run from scripts/
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+ENDPOINTS = ['hash', 'cert_id', 'upload', 'qr']
+ISSUED = datetime(2024, 1, 1)
+
+
+def cert_id(i):
+    return f"R{i:07d}_{1700000000 + i}"
+
+
+def pdf_bytes(i, size):
+    """Synthetic certificate PDF i; the client regenerates it instead of keeping every file"""
+    seed = hashlib.sha256(f"certificate-{i}".encode()).digest()
+    return (b'%PDF-1.4\n' + seed * (size // len(seed) + 1))[:size]
+
+
+def seed_storage(directory, certificates, pdf_size):
+    """Write the scratch database and ledger file the server will start on"""
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(directory, 'bench.db')
+    os.environ['BLOCKCHAIN_FILE'] = ''
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    from app import app, upgrade_schema
+    from blockchain import Block, Blockchain
+    from database import db
+    from models import Certificate
+
+    blockchain = Blockchain(persist_file=os.path.join(directory, 'blockchain_data.json'))
+    chain = blockchain.chain
+    rows = []
+    for i in range(1, certificates + 1):
+        pdf_hash = hashlib.sha256(pdf_bytes(i, pdf_size)).hexdigest()
+        record = json.dumps({'cert_id': cert_id(i), 'pdf_hash': pdf_hash, 'pdf_size': pdf_size}, sort_keys=True)
+        chain.append(Block(i, record, chain[-1].hash, ISSUED + timedelta(seconds=i)))
+        rows.append({
+            'cert_id': cert_id(i), 'student_name': f'Student {i}', 'course_name': 'B.Tech (CSE)',
+            'issue_date': ISSUED + timedelta(seconds=i), 'pdf_path': f'certificates/{cert_id(i)}.pdf',
+            'qr_path': '', 'blockchain_hash': pdf_hash, 'block_index': i, 'is_active': True,
+            'roll_number': f'R{i:07d}'
+        })
+    blockchain.save_to_file()
+
+    with app.app_context():
+        upgrade_schema()
+        for start in range(0, len(rows), 5000):
+            db.session.execute(db.insert(Certificate), rows[start:start + 5000])
+        db.session.commit()
+    return blockchain.persist_file
+
+
+def start_server(directory, port, workers, ledger_file):
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers), BLOCKCHAIN_FILE=ledger_file)
+    log = open(os.path.join(directory, 'gunicorn.log'), 'w')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'app:app', '-c', 'gunicorn.conf.py'],
+                              cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 180
+    while time.time() < deadline:
+        if server.poll() is not None:
+            break
+        try:
+            if request(port, 'GET', '/health/ready')[0] == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    with open(log.name) as f:
+        print(f.read()[-3000:], file=sys.stderr)
+    raise SystemExit(f"❌ gunicorn did not become ready on port {port}")
+
+
+def request(port, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def multipart(fields, filename, content):
+    boundary = uuid.uuid4().hex
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+             for name, value in fields.items()]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f'Content-Type: application/pdf\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+
+class Client(threading.Thread):
+    """Sends requests until the deadline; records (endpoint, outcome, seconds, ok) per request"""
+    def __init__(self, number, args, deadline):
+        super().__init__(name=f'client-{number}', daemon=True)
+        self.args = args
+        self.deadline = deadline
+        self.rng = random.Random(args.seed * 1000 + number)
+        self.endpoints, self.weights = zip(*args.mix.items())
+        self.samples = []
+        self.wrong = 0
+
+    def pick(self):
+        endpoint = self.rng.choices(self.endpoints, self.weights)[0]
+        roll = self.rng.random()
+        if roll < self.args.miss:
+            outcome = 'miss'
+        elif roll < self.args.miss + self.args.tampered and endpoint == 'upload':
+            outcome = 'tampered'
+        else:
+            outcome = 'hit'
+        return endpoint, outcome, self.rng.randint(1, self.args.certificates)
+
+    def run(self):
+        size = self.args.pdf_kb * 1024
+        while time.time() < self.deadline:
+            endpoint, outcome, i = self.pick()
+            pdf = pdf_bytes(i, size)
+            pdf_hash = hashlib.sha256(pdf).hexdigest() if outcome == 'hit' else uuid.uuid4().hex * 2
+            if endpoint == 'hash':
+                args = ('GET', f'/verify?hash={pdf_hash}')
+            elif endpoint == 'cert_id':
+                args = ('GET', f"/verify?cert_id={cert_id(i) if outcome == 'hit' else 'UNKNOWN_' + pdf_hash[:12]}")
+            elif endpoint == 'qr':
+                args = ('POST', '/api/verify/qr', json.dumps({'hash': pdf_hash}), {'Content-Type': 'application/json'})
+            else:
+                if outcome == 'tampered':
+                    pdf = pdf[:-1024] if self.rng.random() < 0.5 else pdf[:size // 2] + b'X' + pdf[size // 2 + 1:]
+                body, headers = multipart({'cert_id': cert_id(i) if outcome != 'miss' else 'UNKNOWN_' + pdf_hash[:12]},
+                                          'certificate.pdf', pdf)
+                args = ('POST', '/verify_upload', body, headers)
+
+            started = time.perf_counter()
+            try:
+                status, content = request(self.args.port, *args)
+                ok = status == 200
+            except (OSError, http.client.HTTPException):
+                ok = False
+            self.samples.append((endpoint, outcome, time.perf_counter() - started, ok))
+            if ok and endpoint == 'qr' and json.loads(content).get('valid') != (outcome == 'hit'):
+                self.wrong += 1
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(name, samples, seconds):
+    latencies = [elapsed for _, _, elapsed, _ in samples]
+    errors = sum(1 for _, _, _, ok in samples if not ok)
+    return {
+        'endpoint': name,
+        'requests': len(samples),
+        'requests_per_sec': round(len(samples) / seconds, 1),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'outcomes': {outcome: sum(1 for _, o, _, _ in samples if o == outcome) for outcome in ('hit', 'miss', 'tampered')}
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--certificates', type=int, default=10000, help='Certificates seeded into the database and ledger')
+    parser.add_argument('--pdf-kb', type=int, default=40, help='Size of each synthetic certificate PDF')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--concurrency', type=int, default=16, help='Client threads')
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--mix', default='hash=4,cert_id=2,upload=1,qr=3', help='Relative weight of each endpoint')
+    parser.add_argument('--miss', type=float, default=0.2, help='Fraction of requests for unknown hashes/IDs')
+    parser.add_argument('--tampered', type=float, default=0.1, help='Fraction of uploads with altered bytes')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON instead of a table')
+    args = parser.parse_args()
+
+    args.mix = {name.strip(): float(weight) for name, _, weight in
+                (item.partition('=') for item in args.mix.split(',') if item.strip())}
+    unknown = set(args.mix) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints in --mix: {', '.join(sorted(unknown))} (choose from {', '.join(ENDPOINTS)})")
+
+    directory = tempfile.mkdtemp(prefix='bench-verify-load-')
+    if not args.json:
+        print(f"⏳ Seeding {args.certificates} certificates in {directory}...", flush=True)
+    ledger_file = seed_storage(directory, args.certificates, args.pdf_kb * 1024)
+    if not args.json:
+        print(f"⏳ Starting gunicorn with {args.workers} workers on port {args.port}...", flush=True)
+    server = start_server(directory, args.port, args.workers, ledger_file)
+    try:
+        if not args.json:
+            print(f"⏳ {args.concurrency} clients for {args.seconds:g}s...", flush=True)
+        deadline = time.time() + args.seconds
+        clients = [Client(number, args, deadline) for number in range(args.concurrency)]
+        started = time.perf_counter()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    samples = [sample for client in clients for sample in client.samples]
+    results = [summarize(name, [s for s in samples if s[0] == name], elapsed) for name in args.mix]
+    results.append(summarize('all', samples, elapsed))
+    report = {
+        'benchmark': 'verify_load',
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'certificates': args.certificates,
+        'workers': args.workers,
+        'concurrency': args.concurrency,
+        'seconds': round(elapsed, 1),
+        'mix': args.mix,
+        'miss': args.miss,
+        'tampered': args.tampered,
+        'wrong_qr_results': sum(client.wrong for client in clients),
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{args.certificates} certificates, {args.workers} workers, {args.concurrency} clients, {elapsed:.1f}s")
+        print(f"{'endpoint':9} {'requests':>9} {'req/s':>8} {'errors':>7} {'err %':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for result in results:
+            print(f"{result['endpoint']:9} {result['requests']:>9} {result['requests_per_sec']:>8} {result['errors']:>7} "
+                  f"{result['error_rate'] * 100:>6.2f} {result['p50_ms']:>8} {result['p95_ms']:>8} {result['p99_ms']:>8}")
+        if report['wrong_qr_results']:
+            print(f"⚠️  {report['wrong_qr_results']} /api/verify/qr responses disagreed with the expected result")
+        if args.output:
+            print(f"\n✅ Results written to {args.output}")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Check that admin and student pages issue a bounded number of SQL queries.
+
+Run with the virtualenv activated:
+    python scripts/check_query_counts.py [--max-queries 12]
+
+Uses a throwaway SQLite database (your real DATABASE_URL is never touched),
+seeds it at two sizes (less than one page of rows, then several pages) and
+requests each page with the per-request query counter enabled. Fails if a page
+needs more than --max-queries statements or if its count grows with the
+number of rows (an N+1 pattern).
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Point the app at a scratch database before it is imported
+SCRATCH_DIR = tempfile.mkdtemp(prefix='query-counts-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(SCRATCH_DIR, 'check.db')
+os.environ['QUERY_COUNTER'] = 'True'
+
+# Ensure project root is on sys.path so imports work when script is run from scripts/
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import app, bootstrap_admin, upgrade_schema
+from database import db
+from models import User, Certificate, VerificationLog
+
+ADMIN_PAGES = ['/admin/dashboard', '/admin/certificates', '/admin/students']
+STUDENT_PAGES = ['/student/dashboard']
+
+
+def seed(target):
+    """Grow the scratch database to `target` students, each with two certificates and verifications"""
+    with app.app_context():
+        existing = User.query.filter_by(role='student').count()
+        base = datetime(2025, 1, 1)
+        for i in range(existing, target):
+            student = User(username=f'student{i}', email=f'student{i}@example.com', role='student',
+                           created_at=base + timedelta(minutes=i))
+            student.set_password('password')
+            db.session.add(student)
+            db.session.flush()
+            for j in range(2):
+                cert = Certificate(student_id=student.id, student_name=f'student{i}', course_name=f'Course {j}',
+                                   issue_date=base + timedelta(minutes=i, seconds=j), pdf_path='-', qr_path='-',
+                                   blockchain_hash=f'{i:08d}{j:02d}')
+                cert.set_marksheet_data({'roll_number': f'{i}', 'subjects': [{'code': 'CS101', 'grade': 'A'}]})
+                db.session.add(cert)
+                db.session.flush()
+                db.session.add(VerificationLog(certificate_id=cert.id, blockchain_hash=cert.blockchain_hash,
+                                               status='Valid'))
+        db.session.commit()
+
+
+def measure(username, password, pages):
+    """Query count per page for one logged-in user"""
+    client = app.test_client()
+    client.post('/login', data={'username': username, 'password': password})
+    counts = {}
+    for page in pages:
+        response = client.get(page)
+        if response.status_code != 200:
+            raise SystemExit(f"❌ {page} returned {response.status_code}")
+        counts[page] = int(response.headers['X-Query-Count'])
+    return counts
+
+
+def run(max_queries):
+    with app.app_context():
+        upgrade_schema()
+        bootstrap_admin()
+
+    results = []
+    for size in (3, 30):
+        seed(size)
+        counts = measure('admin', 'admin123', ADMIN_PAGES)
+        counts.update(measure('student0', 'password', STUDENT_PAGES))
+        results.append(counts)
+        print(f"{size} students: " + ', '.join(f'{page}={count}' for page, count in counts.items()))
+
+    failed = False
+    for page in ADMIN_PAGES + STUDENT_PAGES:
+        small, large = results[0][page], results[1][page]
+        if large > max_queries:
+            print(f"❌ {page}: {large} queries (limit {max_queries})")
+            failed = True
+        elif large > small:
+            print(f"❌ {page}: query count grew with rows ({small} -> {large})")
+            failed = True
+        else:
+            print(f"✓ {page}: {large} queries")
+    return not failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-queries', type=int, default=12, help='Upper bound on SQL statements per page')
+    args = parser.parse_args()
+    sys.exit(0 if run(args.max_queries) else 1)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""Check that dashboard and listing queries use the composite indexes.
+
+Run with the virtualenv activated:
+    python scripts/check_query_plans.py [--database-url postgresql://...]
+
+By default the check runs against a throwaway SQLite database migrated to the
+latest schema version. With --database-url it explains the queries against an
+existing (migrated) database; nothing is written. Exits non-zero if a query's
+plan does not mention its expected index.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+# Ensure project root is on sys.path so imports work when script is run from scripts/
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def plan_checks():
+    """(description, query, acceptable index names) for each hot query"""
+    from sqlalchemy import and_, func, or_
+    from database import db
+    from models import Certificate, VerificationLog
+
+    return [
+        ('student dashboard page',
+         Certificate.query.filter(or_(
+             Certificate.student_id == 1,
+             and_(Certificate.student_id.is_(None), Certificate.student_name.ilike('%student%'))
+         )).order_by(Certificate.issue_date.desc(), Certificate.id.desc()).limit(11),
+         ['ix_certificates_student_issue']),
+        ('certificates filtered by course',
+         Certificate.query.filter(Certificate.course_name == 'BCA')
+         .order_by(Certificate.issue_date.desc(), Certificate.id.desc()).limit(11),
+         ['ix_certificates_course_issue']),
+        ('dashboard recent verifications',
+         VerificationLog.query.order_by(VerificationLog.verified_at.desc()).limit(10),
+         ['ix_verification_logs_verified_status', 'ix_verification_logs_verified_at']),
+        ('verification counts per day and status',
+         db.session.query(func.date(VerificationLog.verified_at), VerificationLog.status, func.count(VerificationLog.id))
+         .group_by(func.date(VerificationLog.verified_at), VerificationLog.status),
+         ['ix_verification_logs_verified_status']),
+        ('verification history of a certificate',
+         VerificationLog.query.filter(VerificationLog.certificate_id == 1)
+         .order_by(VerificationLog.verified_at.desc()).limit(10),
+         ['ix_verification_logs_certificate_verified']),
+    ]
+
+
+def explain(query):
+    """Query plan as one string"""
+    from sqlalchemy import text
+    from database import db
+
+    dialect = db.engine.dialect
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).fetchall()
+        return '\n'.join(str(row[-1]) for row in rows)
+    if dialect.name == 'postgresql':
+        # Small tables are cheaper to scan; ask whether an index *can* serve the query
+        db.session.execute(text('SET LOCAL enable_seqscan = off'))
+    rows = db.session.execute(text(f'EXPLAIN {sql}')).fetchall()
+    return '\n'.join(str(row[0]) for row in rows)
+
+
+def run(scratch):
+    from app import app, upgrade_schema
+    from database import db
+
+    failed = False
+    with app.app_context():
+        if scratch:
+            upgrade_schema()
+        for description, query, indexes in plan_checks():
+            plan = explain(query)
+            used = next((index for index in indexes if index in plan), None)
+            if used:
+                print(f"✓ {description}: {used}")
+            else:
+                print(f"❌ {description}: expected {' or '.join(indexes)}")
+                print('    ' + plan.replace('\n', '\n    '))
+                failed = True
+        db.session.rollback()
+    return not failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='Explain against this database instead of a scratch SQLite file')
+    args = parser.parse_args()
+
+    # The app reads DATABASE_URL when it is imported
+    os.environ['DATABASE_URL'] = args.database_url or \
+        'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='query-plans-'), 'check.db')
+    sys.exit(0 if run(scratch=not args.database_url) else 1)
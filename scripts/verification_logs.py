@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""Archive old verification logs and export archived ones.
+
+Run with the virtualenv activated:
+    python scripts/verification_logs.py archive [--days 90] [--batch-size 1000] [--vacuum]
+    python scripts/verification_logs.py export --start 2025-01-01 --end 2025-02-01 [--format csv] [--output logs.csv]
+    python scripts/verification_logs.py list
+
+`archive` moves rows older than LOG_RETENTION_DAYS into gzip'd JSONL files under
+LOG_ARCHIVE_FOLDER (one file per day) and deletes them in small batches. Suitable
+for a daily cron job. `export` reads the archive files for a date range.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+
+# Ensure project root is on sys.path so imports work when script is run from scripts/
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import app
+from utils.log_archive import ARCHIVE_COLUMNS, archive_verification_logs, compact_database, list_archive_days, read_archived_logs
+from utils.rollups import update_rollups
+
+
+def archive(args):
+    with app.app_context():
+        # Rows must be in the analytics rollups before they leave the table
+        folded = update_rollups(batch_size=app.config['ROLLUP_BATCH_SIZE'], settle_seconds=0)
+        print(f"Folded {folded} new log rows into rollups")
+
+        days = args.days if args.days is not None else app.config['LOG_RETENTION_DAYS']
+        result = archive_verification_logs(
+            app.config['LOG_ARCHIVE_FOLDER'],
+            retention_days=days,
+            batch_size=args.batch_size or app.config['LOG_ARCHIVE_BATCH_SIZE']
+        )
+        print(f"Archived {result['archived']} rows older than {days} days in {result['batches']} batches")
+        for path in result['files']:
+            print(f"  {path}")
+
+        if args.vacuum and result['archived']:
+            if compact_database():
+                print("Database compacted (VACUUM)")
+
+
+def export(args):
+    start = datetime.fromisoformat(args.start)
+    end = datetime.fromisoformat(args.end)
+    rows = read_archived_logs(app.config['LOG_ARCHIVE_FOLDER'], start, end)
+
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        if args.format == 'csv':
+            writer = csv.DictWriter(out, fieldnames=ARCHIVE_COLUMNS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+        else:
+            for row in rows:
+                out.write(json.dumps(row) + '\n')
+    finally:
+        if args.output:
+            out.close()
+
+
+def list_days(args):
+    for day in list_archive_days(app.config['LOG_ARCHIVE_FOLDER']):
+        print(day.isoformat())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    archive_parser = commands.add_parser('archive', help='Archive and delete old verification logs')
+    archive_parser.add_argument('--days', type=int, help='Retention in days (default LOG_RETENTION_DAYS)')
+    archive_parser.add_argument('--batch-size', type=int, help='Rows deleted per transaction')
+    archive_parser.add_argument('--vacuum', action='store_true', help='Compact the SQLite database afterwards')
+    archive_parser.set_defaults(func=archive)
+
+    export_parser = commands.add_parser('export', help='Read archived logs for a date range')
+    export_parser.add_argument('--start', required=True, help='ISO date/time, inclusive')
+    export_parser.add_argument('--end', required=True, help='ISO date/time, exclusive')
+    export_parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    export_parser.add_argument('--output', help='File to write (default stdout)')
+    export_parser.set_defaults(func=export)
+
+    list_parser = commands.add_parser('list', help='List archived days')
+    list_parser.set_defaults(func=list_days)
+
+    args = parser.parse_args()
+    args.func(args)
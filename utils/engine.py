@@ -0,0 +1,59 @@
+# utils/engine.py
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def is_sqlite_file(url):
+    """True for a file-backed SQLite URL (WAL and mmap do not apply to :memory:)"""
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def build_engine_options(config):
+    """
+    Default create_engine() options for the configured database, overlaid with
+    any explicit SQLALCHEMY_ENGINE_OPTIONS (which always win).
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = {}
+    if url.get_backend_name() == 'sqlite':
+        # The busy timeout is also set as a pragma; this covers the initial connect
+        options['connect_args'] = {'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000}
+    else:
+        options.update({
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+            'pool_recycle': config['DB_POOL_RECYCLE'],
+            'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        })
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    return options
+
+
+def sqlite_pragmas(config, url):
+    """PRAGMA statements run on every new SQLite connection"""
+    pragmas = [f"PRAGMA busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+               f"PRAGMA cache_size = -{int(config['SQLITE_CACHE_SIZE_KB'])}"]
+    if is_sqlite_file(url):
+        pragmas += [f"PRAGMA journal_mode = {config['SQLITE_JOURNAL_MODE']}",
+                    f"PRAGMA synchronous = {config['SQLITE_SYNCHRONOUS']}",
+                    f"PRAGMA mmap_size = {int(config['SQLITE_MMAP_SIZE'])}"]
+    return pragmas
+
+
+def install_sqlite_pragmas(engine, config):
+    """Apply the SQLite profile to each pooled connection as it is opened"""
+    if engine.dialect.name != 'sqlite':
+        return []
+    pragmas = sqlite_pragmas(config, engine.url)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return pragmas
@@ -0,0 +1,82 @@
+# utils/hashing.py
+
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 64 KB keeps memory flat while still letting hashlib run at full speed
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def get_stream_size(stream):
+    """
+    Returns the size in bytes of a seekable stream without reading it.
+    Returns None if the stream cannot be sized.
+    """
+    try:
+        position = stream.tell()
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        stream.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def hash_stream(stream, chunk_size=DEFAULT_CHUNK_SIZE, max_bytes=None):
+    """
+    Computes the SHA-256 of a file-like object chunk by chunk.
+    Stops early (exceeded=True) once more than max_bytes have been read.
+    Returns a dict with the hex digest, byte count and throughput.
+    """
+    sha = hashlib.sha256()
+    total_bytes = 0
+    exceeded = False
+    start = time.perf_counter()
+
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        total_bytes += len(chunk)
+        if max_bytes is not None and total_bytes > max_bytes:
+            exceeded = True
+            break
+        sha.update(chunk)
+
+    elapsed = time.perf_counter() - start
+    megabytes = total_bytes / (1024 * 1024)
+
+    return {
+        'hash': sha.hexdigest(),
+        'bytes': total_bytes,
+        'seconds': elapsed,
+        'mb_per_sec': megabytes / elapsed if elapsed > 0 else 0.0,
+        'exceeded': exceeded
+    }
+
+
+def hash_file(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Compute SHA-256 and size of a file on disk without loading it whole"""
+    with open(path, 'rb') as f:
+        return hash_stream(f, chunk_size=chunk_size)
+
+
+def hash_zip_members(archive, members, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=4):
+    """
+    Hashes ZIP archive members in parallel threads (hashlib releases the GIL
+    on large updates). Yields (member, hash_info, error) as each completes.
+    """
+    def hash_member(member):
+        with archive.open(member) as f:
+            return hash_stream(f, chunk_size=chunk_size)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(hash_member, member): member for member in members}
+        for future in as_completed(futures):
+            member = futures[future]
+            try:
+                yield member, future.result(), None
+            except Exception as e:
+                yield member, None, str(e)
@@ -0,0 +1,124 @@
+# utils/log_archive.py
+
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, text
+
+from database import db
+from models.verification_log_model import VerificationLog
+from utils.rollups import get_rollup_watermark
+
+ARCHIVE_COLUMNS = ('id', 'certificate_id', 'blockchain_hash', 'verified_at', 'status', 'ip_address', 'user_agent')
+
+
+def archive_path(archive_dir, day):
+    """Partition file for one day: <dir>/verification_logs/YYYY/MM/verification_logs-YYYY-MM-DD.jsonl.gz"""
+    return os.path.join(archive_dir, 'verification_logs', f"{day.year:04d}", f"{day.month:02d}",
+                        f"verification_logs-{day.isoformat()}.jsonl.gz")
+
+
+def _write_partition(path, rows):
+    """Append rows to a gzip'd JSONL partition (each append adds a gzip member)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, 'at', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, default=str) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def archive_verification_logs(archive_dir, retention_days, batch_size=1000, max_batches=None):
+    """
+    Move verification_logs rows older than retention_days into date-partitioned
+    gzip JSONL files, deleting them in batches of batch_size (one short
+    transaction each). Only rows already folded into the analytics rollups are
+    archived. Returns {'archived': rows, 'batches': n, 'files': [paths]}.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    watermark = get_rollup_watermark()
+    archived = 0
+    batches = 0
+    files = set()
+
+    while max_batches is None or batches < max_batches:
+        logs = VerificationLog.query \
+            .filter(VerificationLog.verified_at < cutoff, VerificationLog.id <= watermark) \
+            .order_by(VerificationLog.id) \
+            .limit(batch_size).all()
+        if not logs:
+            break
+
+        partitions = {}
+        for log in logs:
+            row = {column: getattr(log, column) for column in ARCHIVE_COLUMNS}
+            row['verified_at'] = log.verified_at.isoformat()
+            partitions.setdefault(log.verified_at.date(), []).append(row)
+
+        # Files are written before the delete commits; a crash in between can
+        # only duplicate rows in the archive, which read_archived_logs drops by id
+        for day, rows in partitions.items():
+            path = archive_path(archive_dir, day)
+            _write_partition(path, rows)
+            files.add(path)
+
+        ids = [log.id for log in logs]
+        db.session.execute(delete(VerificationLog).where(VerificationLog.id.in_(ids)))
+        db.session.commit()
+
+        archived += len(ids)
+        batches += 1
+        if len(logs) < batch_size:
+            break
+
+    return {'archived': archived, 'batches': batches, 'files': sorted(files)}
+
+
+def compact_database():
+    """Reclaim space freed by archiving (SQLite VACUUM; other databases are left to autovacuum)"""
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    db.session.commit()
+    with db.engine.connect() as connection:
+        connection.execution_options(isolation_level='AUTOCOMMIT').execute(text('VACUUM'))
+    return True
+
+
+def read_archived_logs(archive_dir, start, end):
+    """
+    Yield archived log rows (dicts) with start <= verified_at < end, oldest
+    partition first, reading only the partitions inside the range.
+    """
+    start_day = start.date() if isinstance(start, datetime) else start
+    end_day = end.date() if isinstance(end, datetime) else end
+    start_at = start if isinstance(start, datetime) else datetime.combine(start, datetime.min.time())
+    end_at = end if isinstance(end, datetime) else datetime.combine(end, datetime.min.time())
+
+    seen = set()
+    day = start_day
+    while day <= end_day:
+        path = archive_path(archive_dir, day)
+        if os.path.exists(path):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    row = json.loads(line)
+                    if row['id'] in seen:
+                        continue
+                    verified_at = datetime.fromisoformat(row['verified_at'])
+                    if start_at <= verified_at < end_at:
+                        seen.add(row['id'])
+                        yield row
+        day += timedelta(days=1)
+
+
+def list_archive_days(archive_dir):
+    """Dates that have an archive partition"""
+    root = os.path.join(archive_dir, 'verification_logs')
+    days = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.startswith('verification_logs-') and filename.endswith('.jsonl.gz'):
+                days.append(date.fromisoformat(filename[len('verification_logs-'):-len('.jsonl.gz')]))
+    return sorted(days)
@@ -0,0 +1,225 @@
+# utils/log_buffer.py
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from database import db
+from models.verification_log_model import VerificationLog
+from utils.metrics import QUEUE_DEPTH, QUEUE_DROPPED
+from utils.rollups import update_rollups
+from utils.stats import record_verifications
+
+logger = logging.getLogger(__name__)
+
+# Longer User-Agent headers are cut to fit, so one cannot fail a whole bulk insert
+USER_AGENT_LENGTH = VerificationLog.user_agent.type.length
+
+
+class VerificationLogBuffer:
+    """
+    In-process buffer for VerificationLog rows.
+    Verification requests only enqueue a record; a background thread writes
+    queued records with bulk inserts once flush_size records are waiting or
+    every flush_interval seconds, and once more at interpreter shutdown.
+    Every rollup_interval seconds the same thread folds new logs into the
+    analytics rollups.
+    The queue is bounded: when it is full the record is dropped (policy
+    'drop_newest') or the oldest queued record is discarded ('drop_oldest').
+    The request thread never waits on the database.
+    """
+    POLICIES = ('drop_newest', 'drop_oldest')
+
+    def __init__(self, app=None):
+        self.app = None
+        self.max_queue = 10000
+        self.flush_size = 200
+        self.flush_interval = 2.0
+        self.policy = 'drop_newest'
+        self.rollup_interval = 60.0
+        self._queue = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._atexit_registered = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read buffer settings from the app config and register the shutdown flush"""
+        self.app = app
+        self.max_queue = app.config.get('LOG_BUFFER_MAX_QUEUE', self.max_queue)
+        self.flush_size = max(1, app.config.get('LOG_BUFFER_FLUSH_SIZE', self.flush_size))
+        self.flush_interval = app.config.get('LOG_BUFFER_FLUSH_INTERVAL', self.flush_interval)
+        self.policy = app.config.get('LOG_BUFFER_POLICY', self.policy)
+        self.rollup_interval = app.config.get('ROLLUP_INTERVAL', self.rollup_interval)
+        if self.policy not in self.POLICIES:
+            raise ValueError(f"LOG_BUFFER_POLICY must be one of {self.POLICIES}")
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        if not self._atexit_registered:
+            atexit.register(self.close)
+            self._atexit_registered = True
+
+    def add(self, certificate_id, blockchain_hash, status, ip_address=None, user_agent=None):
+        """Queue one verification log record; returns False if it was dropped"""
+        record = {
+            'certificate_id': certificate_id,
+            'blockchain_hash': blockchain_hash,
+            'status': status,
+            'ip_address': ip_address,
+            'user_agent': user_agent[:USER_AGENT_LENGTH] if user_agent else user_agent,
+            'verified_at': datetime.utcnow()
+        }
+        self._ensure_worker()
+
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            if self.policy == 'drop_newest':
+                self._drop()
+                return False
+            try:
+                self._queue.get_nowait()
+                self._drop()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self._drop()
+                return False
+
+        self.enqueued += 1
+        depth = self._queue.qsize()
+        QUEUE_DEPTH.labels('verification_logs').set(depth)
+        if depth >= self.flush_size:
+            self._wake.set()
+        return True
+
+    def flush(self):
+        """Write every queued record with bulk inserts; returns the number written"""
+        total = 0
+        with self._flush_lock:
+            while True:
+                rows = self._drain(self.flush_size)
+                if not rows:
+                    break
+                total += self._write(rows)
+        return total
+
+    def close(self):
+        """Stop the writer thread and flush whatever is still queued"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._thread.join(timeout=self.flush_interval + 5)
+        if self._queue is not None and self.app is not None:
+            self.flush()
+
+    def stats(self):
+        """Get buffer statistics"""
+        return {
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'max_queue': self.max_queue,
+            'flush_size': self.flush_size,
+            'flush_interval': self.flush_interval,
+            'policy': self.policy,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'flushes': self.flushes
+        }
+
+    def _ensure_worker(self):
+        """Start the writer thread, again after a fork (e.g. gunicorn --preload)"""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='verification-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Writer thread loop: flush on size threshold or interval, roll up periodically"""
+        last_rollup = time.monotonic()
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            if self.rollup_interval and time.monotonic() - last_rollup >= self.rollup_interval:
+                last_rollup = time.monotonic()
+                self._roll_up()
+
+    def _roll_up(self):
+        """Fold newly written logs into the analytics rollups"""
+        with self.app.app_context():
+            try:
+                update_rollups(batch_size=self.app.config.get('ROLLUP_BATCH_SIZE', 5000),
+                               settle_seconds=self.app.config.get('ROLLUP_SETTLE_SECONDS', 5))
+            except Exception:
+                db.session.rollback()
+                logger.exception('Updating verification rollups failed', extra={'event': 'rollups.failed'})
+
+    def _drop(self):
+        self.dropped += 1
+        QUEUE_DROPPED.labels('verification_logs').inc()
+
+    def _drain(self, limit):
+        """Take up to limit records off the queue"""
+        rows = []
+        while len(rows) < limit:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        QUEUE_DEPTH.labels('verification_logs').set(self._queue.qsize())
+        return rows
+
+    def _write(self, rows):
+        """Bulk insert rows in their own app context and session; falls back to row by row"""
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(VerificationLog), rows)
+                record_verifications(rows)
+                db.session.commit()
+                self.written += len(rows)
+                self.flushes += 1
+                return len(rows)
+            except Exception:
+                db.session.rollback()
+                logger.warning('Bulk insert of verification logs failed; retrying row by row',
+                               exc_info=True, extra={'event': 'log_buffer.bulk_failed', 'rows': len(rows)})
+
+            written = 0
+            for row in rows:
+                try:
+                    db.session.execute(insert(VerificationLog), [row])
+                    record_verifications([row])
+                    db.session.commit()
+                    written += 1
+                except Exception:
+                    db.session.rollback()
+                    self.failed += 1
+                    logger.exception('Writing a verification log failed', extra={
+                        'event': 'log_buffer.write_failed', 'status': row.get('status')})
+            self.written += written
+            self.flushes += 1
+            return written
@@ -0,0 +1,73 @@
+# utils/metrics.py
+#
+# Prometheus metrics for /metrics. Under gunicorn every worker writes its
+# values to files in PROMETHEUS_MULTIPROC_DIR (set in gunicorn.conf.py before
+# the app is imported) and a scrape of any worker merges all of them. Without
+# the variable (flask run, scripts) the metrics are this process's only.
+
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint',
+    ['endpoint', 'method'])
+REQUESTS = Counter(
+    'http_requests', 'Requests by endpoint and status code',
+    ['endpoint', 'method', 'status'])
+VERIFICATIONS = Counter(
+    'certificate_verifications', 'Verification outcomes (Valid/Invalid/Tampered/Error) by entry point',
+    ['source', 'status'])
+CERTIFICATES_ISSUED = Counter(
+    'certificates_issued', 'Certificates issued', ['mode'])
+LEDGER_HEIGHT = Gauge(
+    'ledger_height_blocks', 'Blocks in the ledger, genesis included', multiprocess_mode='livemax')
+LEDGER_APPEND_LATENCY = Histogram(
+    'ledger_append_duration_seconds', 'Time to append (and persist) a ledger block',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+PDF_RENDER_LATENCY = Histogram(
+    'pdf_render_duration_seconds', 'Time for wkhtmltopdf to render one certificate PDF',
+    buckets=(0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 20, 30, 60))
+QUEUE_DEPTH = Gauge(
+    'background_queue_depth', 'Items waiting in a background worker queue', ['queue'],
+    multiprocess_mode='livesum')
+QUEUE_DROPPED = Counter(
+    'background_queue_dropped', 'Items dropped because a background queue was full', ['queue'])
+
+
+def record_verification(source, status):
+    VERIFICATIONS.labels(source=source, status=status).inc()
+
+
+def init_metrics(app):
+    """Time every request for /metrics (METRICS_ENABLED, on by default)"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return False
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            endpoint = request.endpoint or 'unmatched'
+            REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - started)
+            REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+        return response
+
+    return True
+
+
+def render_metrics():
+    """(body, content type) of the Prometheus text exposition for all workers"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
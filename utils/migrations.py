@@ -0,0 +1,223 @@
+# utils/migrations.py
+
+from datetime import datetime
+
+from sqlalchemy import func, inspect, text, update
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models.certificate_model import Certificate
+from models.daily_stats_model import DailyStats
+from models.schema_migration_model import SchemaMigration
+from models.user_model import User
+from models.verification_log_model import VerificationLog
+from models.verification_rollup_model import VerificationRollup
+from utils.stats import rebuild_daily_stats
+
+
+def backfill_cert_ids(blockchain):
+    """Copy cert_id from each block's issuance record onto its certificate row"""
+    cert_ids_by_hash = {}
+    for block in blockchain.chain:
+        block_data = block.get_data()
+        if block_data and block_data.get('cert_id') and block_data.get('pdf_hash'):
+            cert_ids_by_hash.setdefault(block_data['pdf_hash'], block_data['cert_id'])
+
+    # Column-level queries only: this runs before later migrations have added their columns
+    assigned = {row[0] for row in db.session.query(Certificate.cert_id).filter(Certificate.cert_id.isnot(None))}
+    updated = 0
+    for certificate_id, blockchain_hash in db.session.query(Certificate.id, Certificate.blockchain_hash) \
+            .filter(Certificate.cert_id.is_(None)).all():
+        cert_id = cert_ids_by_hash.get(blockchain_hash)
+        if cert_id and cert_id not in assigned:
+            db.session.execute(update(Certificate).where(Certificate.id == certificate_id).values(cert_id=cert_id))
+            assigned.add(cert_id)
+            updated += 1
+    db.session.commit()
+    return updated
+
+
+def backfill_marksheet_fields(batch_size=500):
+    """Fill the indexed marksheet columns and certificate_subjects rows from marksheet_data JSON"""
+    updated = 0
+    last_id = 0
+    while True:
+        certificates = Certificate.query \
+            .filter(Certificate.id > last_id,
+                    Certificate.marksheet_data.isnot(None),
+                    Certificate.roll_number.is_(None),
+                    ~Certificate.subjects.any()) \
+            .order_by(Certificate.id) \
+            .limit(batch_size).all()
+        if not certificates:
+            break
+        for certificate in certificates:
+            try:
+                certificate.sync_marksheet_fields(certificate.get_marksheet_data())
+                updated += 1
+            except (TypeError, ValueError):
+                continue
+        last_id = certificates[-1].id
+        db.session.commit()
+    return updated
+
+
+def _columns(table):
+    return {column['name'] for column in inspect(db.session.connection()).get_columns(table)}
+
+
+def _add_columns(table, columns):
+    """ALTER TABLE ... ADD COLUMN for each (name, type) not already present"""
+    existing = _columns(table)
+    for name, ddl_type in columns:
+        if name not in existing:
+            db.session.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {ddl_type}'))
+
+
+def _create_indexes(model, names):
+    """Create the named indexes declared on model if they do not exist yet"""
+    indexes = {index.name: index for index in model.__table__.indexes}
+    for name in names:
+        indexes[name].create(db.session.connection(), checkfirst=True)
+
+
+def _add_marksheet_data(blockchain):
+    _add_columns('certificates', [('marksheet_data', 'TEXT')])
+
+
+def _add_cert_id(blockchain):
+    added = 'cert_id' not in _columns('certificates')
+    # SQLite cannot add a UNIQUE column, so the constraint comes from the index
+    _add_columns('certificates', [('cert_id', 'VARCHAR(100)')])
+    _create_indexes(Certificate, ['ix_certificates_cert_id'])
+    db.session.commit()
+    if added and blockchain is not None:
+        print(f"✓ Backfilled cert_id for {backfill_cert_ids(blockchain)} certificate(s) from the blockchain")
+
+
+def _add_marksheet_columns(blockchain):
+    _add_columns('certificates', [
+        ('roll_number', 'VARCHAR(50)'),
+        ('college_id', 'VARCHAR(50)'),
+        ('semester_info', 'VARCHAR(150)'),
+        ('result_date', 'DATE')
+    ])
+    _create_indexes(Certificate, ['ix_certificates_roll_number', 'ix_certificates_college_id',
+                                  'ix_certificates_semester_info', 'ix_certificates_result_date'])
+    db.session.commit()
+    print(f"✓ Backfilled marksheet fields for {backfill_marksheet_fields()} certificate(s)")
+
+
+def _seed_daily_stats(blockchain):
+    # Afterwards daily_stats is maintained incrementally at issuance/verification time
+    if db.session.query(DailyStats.day).first() is None and \
+            (db.session.query(Certificate.id).first() is not None or
+             db.session.query(VerificationLog.id).first() is not None):
+        print(f"✓ Built daily_stats for {rebuild_daily_stats()} day(s)")
+
+
+def _add_performance_indexes(blockchain):
+    _create_indexes(User, ['ix_users_created_at'])
+    _create_indexes(Certificate, ['ix_certificates_student_issue', 'ix_certificates_course_issue'])
+    _create_indexes(VerificationLog, ['ix_verification_logs_verified_status',
+                                      'ix_verification_logs_certificate_verified'])
+
+
+def _require_user_created_at(blockchain):
+    # Keyset pagination of the student listing sorts on created_at, so it may not be NULL
+    updated = db.session.execute(update(User).where(User.created_at.is_(None))
+                                 .values(created_at=datetime(1970, 1, 1))).rowcount
+    if updated:
+        print(f"✓ Backfilled created_at for {updated} user(s)")
+    # SQLite cannot alter a column constraint without rebuilding the table; new databases get it from the model
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text('ALTER TABLE users ALTER COLUMN created_at SET NOT NULL'))
+
+
+def merge_duplicate_rollups():
+    """Sum rollup rows sharing a bucket key into the oldest one; returns the rows removed"""
+    key = (VerificationRollup.granularity, VerificationRollup.bucket_start,
+           VerificationRollup.status, VerificationRollup.certificate_id)
+    if not db.session.query(*key).group_by(*key).having(func.count(VerificationRollup.id) > 1).first():
+        return 0
+
+    removed = 0
+    kept = None
+    for row in VerificationRollup.query.order_by(*key, VerificationRollup.id).all():
+        if kept is not None and (kept.granularity, kept.bucket_start, kept.status, kept.certificate_id) == \
+                (row.granularity, row.bucket_start, row.status, row.certificate_id):
+            kept.count += row.count
+            db.session.delete(row)
+            removed += 1
+        else:
+            kept = row
+    db.session.commit()
+    return removed
+
+
+def _settle_rollups_on_insert_time(blockchain):
+    # SQLite cannot add a column with a non-constant default; new SQLite databases get it from the model
+    ddl_type = 'DATETIME' if db.engine.dialect.name == 'sqlite' else 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'
+    _add_columns('verification_logs', [('logged_at', ddl_type)])
+    removed = merge_duplicate_rollups()
+    if removed:
+        print(f"✓ Merged {removed} duplicate rollup row(s)")
+    _create_indexes(VerificationRollup, ['uq_verification_rollups_key'])
+
+
+# (version, name, function). Append only: never renumber or edit an applied migration.
+MIGRATIONS = [
+    (1, 'add certificates.marksheet_data', _add_marksheet_data),
+    (2, 'add certificates.cert_id', _add_cert_id),
+    (3, 'add indexed marksheet columns', _add_marksheet_columns),
+    (4, 'seed daily_stats', _seed_daily_stats),
+    (5, 'add composite indexes for dashboard and listing queries', _add_performance_indexes),
+    (6, 'backfill and require users.created_at', _require_user_created_at),
+    (7, 'settle rollups on insert time and make rollup buckets unique', _settle_rollups_on_insert_time),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version():
+    """Highest applied migration version (0 if none are recorded)"""
+    if 'schema_migrations' not in inspect(db.engine).get_table_names():
+        return 0
+    versions = [row[0] for row in db.session.query(SchemaMigration.version)]
+    return max(versions, default=0)
+
+
+def _record(version, name):
+    """Record a migration; False if another process recorded it first"""
+    try:
+        db.session.add(SchemaMigration(version=version, name=name))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+
+def run_migrations(blockchain=None):
+    """
+    Create missing tables, then apply pending migrations in version order,
+    recording each one in schema_migrations. A fresh database already has the
+    current schema from create_all, so it is only stamped. Every migration is
+    idempotent, so a worker racing another one re-checks instead of failing.
+    Returns the versions applied.
+    """
+    fresh = 'certificates' not in inspect(db.engine).get_table_names()
+    db.create_all()
+    applied = {row[0] for row in db.session.query(SchemaMigration.version)}
+
+    ran = []
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        if not fresh:
+            migrate(blockchain)
+            db.session.commit()
+            print(f"✓ Migration {version}: {name}")
+        if _record(version, name):
+            ran.append(version)
+    return ran
@@ -0,0 +1,95 @@
+# utils/pagination.py
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+class KeysetPage:
+    """
+    One page of a newest-first keyset listing.
+    Templates tell it apart from Flask-SQLAlchemy's Pagination by cursor_based.
+    """
+    cursor_based = True
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def encode_cursor(direction, sort_value, row_id):
+    """Opaque, URL-safe cursor for the (sort_value, id) position of a row"""
+    payload = json.dumps({'d': direction, 'v': sort_value.isoformat(), 'id': row_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (direction, sort_value, id) or None for a missing or malformed cursor"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload['d']
+        if direction not in ('next', 'prev'):
+            return None
+        return direction, datetime.fromisoformat(payload['v']), int(payload['id'])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+
+
+def keyset_paginate(query, sort_column, id_column, cursor=None, per_page=10):
+    """
+    Paginate query newest-first on (sort_column, id_column) without OFFSET or
+    COUNT: each page is one indexed range scan of per_page + 1 rows.
+    sort_column must be a non-null DateTime column.
+    """
+    position = decode_cursor(cursor)
+    direction = position[0] if position else 'next'
+
+    if position and direction == 'next':
+        _, sort_value, row_id = position
+        query = query.filter(or_(sort_column < sort_value,
+                                 and_(sort_column == sort_value, id_column < row_id)))
+    elif position:
+        _, sort_value, row_id = position
+        query = query.filter(or_(sort_column > sort_value,
+                                 and_(sort_column == sort_value, id_column > row_id)))
+
+    if direction == 'next':
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == 'prev':
+        rows.reverse()
+
+    if not rows:
+        return KeysetPage([])
+
+    def cursor_for(row, towards):
+        return encode_cursor(towards, getattr(row, sort_column.key), getattr(row, id_column.key))
+
+    if direction == 'next':
+        next_cursor = cursor_for(rows[-1], 'next') if has_more else None
+        prev_cursor = cursor_for(rows[0], 'prev') if position else None
+    else:
+        next_cursor = cursor_for(rows[-1], 'next')
+        prev_cursor = cursor_for(rows[0], 'prev') if has_more else None
+
+    return KeysetPage(rows, next_cursor=next_cursor, prev_cursor=prev_cursor)
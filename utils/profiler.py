@@ -0,0 +1,173 @@
+# utils/profiler.py
+
+import cProfile
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+
+class _StackSampler:
+    """
+    One thread per process that records the Python stack of every thread
+    being profiled every `interval` seconds, as collapsed stacks
+    ("outer;inner;leaf" -> samples).
+    """
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}  # thread ident -> Counter of collapsed stacks
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def start(self, ident):
+        with self._lock:
+            self._active[ident] = Counter()
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+
+    def stop(self, ident):
+        with self._lock:
+            return self._active.pop(ident, Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for ident, stacks in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stacks[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+
+class RequestProfiler:
+    """
+    Profiles a random PROFILE_SAMPLE_RATE fraction of requests (optionally
+    only the endpoints in PROFILE_ENDPOINTS) and writes one file per
+    profiled request to PROFILE_FOLDER:
+    - mode 'cprofile': a .pstats file (open with pstats or snakeviz)
+    - mode 'sample': a .collapsed file of stacks sampled every
+      PROFILE_SAMPLE_INTERVAL seconds (feed to flamegraph.pl / speedscope)
+    With a sample rate of 0 (the default) no request hooks are registered.
+    Only the newest PROFILE_MAX_FILES files are kept.
+    """
+    MODES = ('cprofile', 'sample')
+    EXTENSIONS = ('.pstats', '.collapsed')
+
+    def __init__(self, app=None):
+        self.folder = 'profiles'
+        self.sample_rate = 0.0
+        self.endpoints = set()
+        self.mode = 'cprofile'
+        self.max_files = 200
+        self.enabled = False
+        self._sampler = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read profiler settings and hook requests if sampling is on"""
+        self.folder = app.config.get('PROFILE_FOLDER', self.folder)
+        self.sample_rate = app.config.get('PROFILE_SAMPLE_RATE', self.sample_rate)
+        self.endpoints = {name.strip() for name in app.config.get('PROFILE_ENDPOINTS', '').split(',') if name.strip()}
+        self.mode = app.config.get('PROFILE_MODE', self.mode)
+        self.max_files = app.config.get('PROFILE_MAX_FILES', self.max_files)
+        if self.mode not in self.MODES:
+            raise ValueError(f"PROFILE_MODE must be one of {self.MODES}")
+        self.enabled = self.sample_rate > 0
+        if not self.enabled:
+            return False
+        if self.mode == 'sample':
+            self._sampler = _StackSampler(app.config.get('PROFILE_SAMPLE_INTERVAL', 0.005))
+        app.before_request(self._start)
+        app.teardown_request(self._stop)
+        return True
+
+    def list_profiles(self):
+        """Profile files, newest first"""
+        if not os.path.isdir(self.folder):
+            return []
+        profiles = []
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and entry.name.endswith(self.EXTENSIONS):
+                stat = entry.stat()
+                profiles.append({
+                    'name': entry.name,
+                    'bytes': stat.st_size,
+                    'created': datetime.utcfromtimestamp(stat.st_mtime).isoformat() + 'Z'
+                })
+        profiles.sort(key=lambda profile: profile['created'], reverse=True)
+        return profiles
+
+    def _wanted(self):
+        endpoint = request.endpoint or ''
+        if self.endpoints and endpoint not in self.endpoints and endpoint.rpartition('.')[2] not in self.endpoints:
+            return False
+        return random.random() < self.sample_rate
+
+    def _start(self):
+        if not self._wanted():
+            return
+        g.profile_started = time.perf_counter()
+        if self.mode == 'cprofile':
+            g.profile = cProfile.Profile()
+            g.profile.enable()
+        else:
+            self._sampler.start(threading.get_ident())
+            g.profile = None
+
+    def _stop(self, exc=None):
+        if 'profile_started' not in g:
+            return
+        elapsed_ms = (time.perf_counter() - g.pop('profile_started')) * 1000
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.disable()
+        else:
+            stacks = self._sampler.stop(threading.get_ident())
+
+        endpoint = re.sub(r'[^A-Za-z0-9_.-]', '_', request.endpoint or 'unmatched')
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        path = os.path.join(self.folder, f"{stamp}_{os.getpid()}_{endpoint}_{elapsed_ms:.0f}ms")
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            if profile is not None:
+                profile.dump_stats(path + '.pstats')
+            else:
+                with open(path + '.collapsed', 'w') as f:
+                    for stack, samples in stacks.most_common():
+                        f.write(f"{stack} {samples}\n")
+            self._prune()
+        except OSError:
+            logger.exception('Writing a request profile failed', extra={'event': 'profiler.write_failed'})
+
+    def _prune(self):
+        """Delete the oldest files beyond max_files"""
+        for profile in self.list_profiles()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.folder, profile['name']))
+            except OSError:
+                pass
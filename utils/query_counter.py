@@ -0,0 +1,47 @@
+# utils/query_counter.py
+
+import logging
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+from database import db
+
+logger = logging.getLogger(__name__)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and 'query_count' in g:
+        g.query_count += 1
+
+
+def init_query_counter(app):
+    """
+    Count SQL statements per request (debug mode or QUERY_COUNTER=True).
+    The count is sent as an X-Query-Count header, and requests issuing more
+    than QUERY_COUNT_WARN statements are printed so N+1 patterns show up.
+    Safe to call again (e.g. after turning debug on); hooks are added once.
+    """
+    if app.extensions.get('query_counter'):
+        return True
+    if not (app.debug or app.config.get('QUERY_COUNTER')):
+        return False
+    app.extensions['query_counter'] = True
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _count_query)
+
+    @app.before_request
+    def start_query_count():
+        g.query_count = 0
+
+    @app.after_request
+    def report_query_count(response):
+        count = g.get('query_count', 0)
+        response.headers['X-Query-Count'] = str(count)
+        if count > app.config.get('QUERY_COUNT_WARN', 20):
+            logger.warning('%s %s issued %d SQL queries', request.method, request.path, count,
+                           extra={'event': 'query_count.high', 'endpoint': request.endpoint, 'queries': count})
+        return response
+
+    return True
@@ -0,0 +1,176 @@
+# utils/rollups.py
+
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models.certificate_model import Certificate
+from models.verification_log_model import VerificationLog
+from models.verification_rollup_model import VerificationRollup, RollupState
+
+ROLLUP_NAME = 'verification_logs'
+GRANULARITIES = ('hour', 'day')
+STATUSES = ('Valid', 'Invalid', 'Tampered')
+
+
+def bucket_start(value, granularity):
+    """Truncate a datetime to the start of its hour or day"""
+    if granularity == 'hour':
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _get_state():
+    """Load (or create) the rollup high-water mark row"""
+    state = db.session.get(RollupState, ROLLUP_NAME)
+    if state is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(RollupState(name=ROLLUP_NAME, last_log_id=0))
+        except IntegrityError:
+            pass
+        state = db.session.get(RollupState, ROLLUP_NAME)
+    return state
+
+
+def _fold_batch(batch_size, settle_seconds):
+    """Fold one batch of logs past the high-water mark; returns rows folded"""
+    state = _get_state()
+    last_log_id = state.last_log_id
+
+    logs = db.session.query(VerificationLog.id, VerificationLog.certificate_id,
+                            VerificationLog.status, VerificationLog.verified_at, VerificationLog.logged_at) \
+        .filter(VerificationLog.id > last_log_id) \
+        .order_by(VerificationLog.id) \
+        .limit(batch_size).all()
+
+    # Leave rows inserted in the last settle_seconds for the next run, so a lower id committed
+    # late by another process is not skipped. Compared on the database clock (logged_at), as
+    # verified_at is when log_buffer queued the row. NULL logged_at (SQLite databases upgraded
+    # by migration 7) counts as settled: SQLite writers commit in id order.
+    now = db.session.scalar(select(func.current_timestamp())).replace(tzinfo=None)
+    cutoff = now - timedelta(seconds=settle_seconds)
+    folded = []
+    for log in logs:
+        if log.logged_at is not None and log.logged_at > cutoff:
+            break
+        folded.append(log)
+
+    if not folded:
+        db.session.rollback()
+        return 0
+
+    counts = Counter()
+    for log in folded:
+        for granularity in GRANULARITIES:
+            counts[(granularity, bucket_start(log.verified_at, granularity), log.status, log.certificate_id)] += 1
+
+    buckets = defaultdict(set)
+    for granularity, start, _, _ in counts:
+        buckets[granularity].add(start)
+
+    existing = {}
+    for granularity, starts in buckets.items():
+        rows = VerificationRollup.query.filter(
+            VerificationRollup.granularity == granularity,
+            VerificationRollup.bucket_start.in_(starts)
+        ).all()
+        for row in rows:
+            existing[(row.granularity, row.bucket_start, row.status, row.certificate_id)] = row
+
+    for (granularity, start, status, certificate_id), count in counts.items():
+        row = existing.get((granularity, start, status, certificate_id))
+        if row:
+            row.count += count
+        else:
+            db.session.add(VerificationRollup(granularity=granularity, bucket_start=start, status=status,
+                                              certificate_id=certificate_id, count=count))
+
+    # Move the high-water mark only if no other process folded these rows meanwhile
+    try:
+        result = db.session.execute(
+            update(RollupState)
+            .where(RollupState.name == ROLLUP_NAME, RollupState.last_log_id == last_log_id)
+            .values(last_log_id=folded[-1].id, updated_at=datetime.utcnow())
+        )
+        if result.rowcount != 1:
+            db.session.rollback()
+            return 0
+        db.session.commit()
+    except IntegrityError:
+        # Another process inserted the same bucket row first; retry from its watermark next run
+        db.session.rollback()
+        return 0
+    return len(folded)
+
+
+def update_rollups(batch_size=5000, settle_seconds=5, max_batches=None):
+    """
+    Fold verification_logs rows newer than the high-water mark into hourly
+    and daily rollups, batch by batch. Returns the number of rows folded.
+    """
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        folded = _fold_batch(batch_size, settle_seconds)
+        total += folded
+        batches += 1
+        if folded < batch_size:
+            break
+    return total
+
+
+def get_rollup_watermark():
+    """Last verification_logs.id included in the rollups"""
+    state = db.session.get(RollupState, ROLLUP_NAME)
+    return state.last_log_id if state else 0
+
+
+def get_verification_series(start, end, granularity='hour', certificate_id=None):
+    """Per-bucket counts by status for [start, end), read from rollups only"""
+    query = db.session.query(VerificationRollup.bucket_start, VerificationRollup.status,
+                             func.sum(VerificationRollup.count)) \
+        .filter(VerificationRollup.granularity == granularity,
+                VerificationRollup.bucket_start >= bucket_start(start, granularity),
+                VerificationRollup.bucket_start < end)
+    if certificate_id is not None:
+        query = query.filter(VerificationRollup.certificate_id == certificate_id)
+    rows = query.group_by(VerificationRollup.bucket_start, VerificationRollup.status) \
+        .order_by(VerificationRollup.bucket_start).all()
+
+    series = {}
+    for start_at, status, count in rows:
+        point = series.setdefault(start_at, dict({'bucket': start_at.isoformat(), 'total': 0},
+                                                 **{s: 0 for s in STATUSES}))
+        point[status] = point.get(status, 0) + count
+        point['total'] += count
+    return list(series.values())
+
+
+def get_top_certificates(start, end, limit=10):
+    """Most verified certificates in [start, end) from daily rollups"""
+    total = func.sum(VerificationRollup.count).label('total')
+    rows = db.session.query(VerificationRollup.certificate_id, total) \
+        .filter(VerificationRollup.granularity == 'day',
+                VerificationRollup.bucket_start >= bucket_start(start, 'day'),
+                VerificationRollup.bucket_start < end,
+                VerificationRollup.certificate_id.isnot(None)) \
+        .group_by(VerificationRollup.certificate_id) \
+        .order_by(total.desc()) \
+        .limit(limit).all()
+
+    names = {}
+    if rows:
+        certificates = db.session.query(Certificate.id, Certificate.student_name, Certificate.course_name) \
+            .filter(Certificate.id.in_([row[0] for row in rows])).all()
+        names = {cert.id: cert for cert in certificates}
+
+    return [{
+        'certificate_id': certificate_id,
+        'student_name': names[certificate_id].student_name if certificate_id in names else None,
+        'course_name': names[certificate_id].course_name if certificate_id in names else None,
+        'verifications': count
+    } for certificate_id, count in rows]
@@ -0,0 +1,175 @@
+# utils/search.py
+
+import logging
+import re
+
+from sqlalchemy import Float, Integer, inspect, text
+
+from database import db
+
+logger = logging.getLogger(__name__)
+
+# Columns indexed for admin search. roll_number lives inside the marksheet JSON.
+SQLITE_CERTIFICATE_FTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS certificates_fts USING fts5(
+        student_name, course_name, blockchain_hash, cert_id, roll_number, tokenize='unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS certificates_fts_ai AFTER INSERT ON certificates BEGIN
+        INSERT INTO certificates_fts(rowid, student_name, course_name, blockchain_hash, cert_id, roll_number)
+        VALUES (new.id, new.student_name, new.course_name, new.blockchain_hash, new.cert_id,
+                CASE WHEN json_valid(new.marksheet_data) THEN json_extract(new.marksheet_data, '$.roll_number') END);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS certificates_fts_ad AFTER DELETE ON certificates BEGIN
+        DELETE FROM certificates_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS certificates_fts_au AFTER UPDATE ON certificates BEGIN
+        DELETE FROM certificates_fts WHERE rowid = old.id;
+        INSERT INTO certificates_fts(rowid, student_name, course_name, blockchain_hash, cert_id, roll_number)
+        VALUES (new.id, new.student_name, new.course_name, new.blockchain_hash, new.cert_id,
+                CASE WHEN json_valid(new.marksheet_data) THEN json_extract(new.marksheet_data, '$.roll_number') END);
+    END"""
+]
+
+SQLITE_CERTIFICATE_FTS_REBUILD = [
+    "DELETE FROM certificates_fts",
+    """INSERT INTO certificates_fts(rowid, student_name, course_name, blockchain_hash, cert_id, roll_number)
+       SELECT id, student_name, course_name, blockchain_hash, cert_id,
+              CASE WHEN json_valid(marksheet_data) THEN json_extract(marksheet_data, '$.roll_number') END
+       FROM certificates"""
+]
+
+SQLITE_USER_FTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(username, email, tokenize='unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        DELETE FROM users_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE ON users BEGIN
+        DELETE FROM users_fts WHERE rowid = old.id;
+        INSERT INTO users_fts(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END"""
+]
+
+SQLITE_USER_FTS_REBUILD = [
+    "DELETE FROM users_fts",
+    "INSERT INTO users_fts(rowid, username, email) SELECT id, username, email FROM users"
+]
+
+# Postgres keeps the vectors in generated columns, so they follow every insert/update
+POSTGRES_SEARCH = [
+    """ALTER TABLE certificates ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('simple', coalesce(student_name, '') || ' ' || coalesce(course_name, '') || ' ' ||
+                              coalesce(blockchain_hash, '') || ' ' || coalesce(cert_id, '') || ' ' ||
+                              coalesce(marksheet_data::jsonb ->> 'roll_number', ''))) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_certificates_search_vector ON certificates USING GIN (search_vector)",
+    """ALTER TABLE users ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('simple', coalesce(username, '') || ' ' || coalesce(email, ''))) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_users_search_vector ON users USING GIN (search_vector)"
+]
+
+# Per-process answer to "does this database have the index?" (None = not checked yet)
+_available = None
+
+SEARCH_TABLES = {
+    'certificates': {'sqlite': 'certificates_fts', 'postgresql': 'certificates'},
+    'users': {'sqlite': 'users_fts', 'postgresql': 'users'}
+}
+
+
+def _terms(query):
+    """Split free text into search terms (letters/digits only, so nothing needs escaping)"""
+    return re.findall(r'\w+', query.lower())
+
+
+def ensure_search_index():
+    """
+    Create the full-text index and its sync triggers/columns if missing,
+    filling it from existing rows the first time. Returns True if available.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        existing = inspect(db.engine).get_table_names()
+        try:
+            for statement in SQLITE_CERTIFICATE_FTS + SQLITE_USER_FTS:
+                db.session.execute(text(statement))
+            if 'certificates_fts' not in existing:
+                for statement in SQLITE_CERTIFICATE_FTS_REBUILD:
+                    db.session.execute(text(statement))
+            if 'users_fts' not in existing:
+                for statement in SQLITE_USER_FTS_REBUILD:
+                    db.session.execute(text(statement))
+            db.session.commit()
+            _set_available(True)
+            return True
+        except Exception as e:
+            # SQLite built without FTS5: admin search falls back to LIKE
+            db.session.rollback()
+            logger.warning('Full-text search unavailable: %s', e, extra={'event': 'search.unavailable'})
+            return False
+
+    if dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH:
+            db.session.execute(text(statement))
+        db.session.commit()
+        _set_available(True)
+        return True
+
+    return False
+
+
+def _set_available(value):
+    global _available
+    _available = value
+
+
+def search_index_available():
+    """
+    True if the full-text index exists (created by `flask init-db`). Checked
+    once per process; until it exists admin search falls back to LIKE.
+    """
+    if _available is None:
+        dialect = db.engine.dialect.name
+        if dialect == 'sqlite':
+            tables = inspect(db.engine).get_table_names()
+            _set_available('certificates_fts' in tables and 'users_fts' in tables)
+        elif dialect == 'postgresql':
+            columns = {column['name'] for column in inspect(db.engine).get_columns('users')}
+            _set_available('search_vector' in columns)
+        else:
+            _set_available(False)
+    return _available
+
+
+def rebuild_search_index():
+    """Re-fill the SQLite FTS tables from the base tables"""
+    if db.engine.dialect.name != 'sqlite':
+        return
+    for statement in SQLITE_CERTIFICATE_FTS_REBUILD + SQLITE_USER_FTS_REBUILD:
+        db.session.execute(text(statement))
+    db.session.commit()
+
+
+def search_subquery(table, query):
+    """
+    Ranked matches for table ('certificates' or 'users') as a subquery with
+    columns (id, score); higher score is a better match. Every term is a
+    prefix match, so partial hashes and roll numbers work. Returns None if
+    the query has no terms or no index is available.
+    """
+    terms = _terms(query)
+    dialect = db.engine.dialect.name
+    if not terms or dialect not in SEARCH_TABLES[table]:
+        return None
+
+    index_table = SEARCH_TABLES[table][dialect]
+    if dialect == 'sqlite':
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        statement = text(f"SELECT rowid AS id, -bm25({index_table}) AS score "
+                         f"FROM {index_table} WHERE {index_table} MATCH :match")
+    else:
+        match = ' & '.join(f'{term}:*' for term in terms)
+        statement = text(f"SELECT id, ts_rank(search_vector, to_tsquery('simple', :match)) AS score "
+                         f"FROM {index_table} WHERE search_vector @@ to_tsquery('simple', :match)")
+
+    return statement.bindparams(match=match).columns(id=Integer, score=Float).subquery()
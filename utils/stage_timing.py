@@ -0,0 +1,110 @@
+# utils/stage_timing.py
+
+import threading
+import time
+from contextlib import nullcontext
+
+from flask import g, has_request_context, request
+
+# Set by init_stage_timing; while False, timed() is a shared no-op context
+_enabled = False
+_NOOP = nullcontext()
+
+
+class _Stage:
+    """Adds the time spent inside the block to the request's stage total and/or a caller's dict"""
+    __slots__ = ('name', 'totals', 'started')
+
+    def __init__(self, name, totals):
+        self.name = name
+        self.totals = totals
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        if self.totals is not None:
+            self.totals[self.name] = self.totals.get(self.name, 0.0) + elapsed
+        if _enabled and has_request_context():
+            timings = g.setdefault('stage_timings', {})
+            timings[self.name] = timings.get(self.name, 0.0) + elapsed
+        return False
+
+
+class StageStats:
+    """Per-endpoint, per-stage request counts and durations (per worker process)"""
+    def __init__(self):
+        self._stats = {}  # (endpoint, stage) -> [requests, total seconds, max seconds]
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, timings):
+        with self._lock:
+            for stage, seconds in timings.items():
+                entry = self._stats.setdefault((endpoint, stage), [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+
+    def stats(self):
+        """{endpoint: {stage: {requests, avg_ms, max_ms, total_ms}}}"""
+        with self._lock:
+            items = list(self._stats.items())
+        result = {}
+        for (endpoint, stage), (requests, total, longest) in items:
+            result.setdefault(endpoint, {})[stage] = {
+                'requests': requests,
+                'avg_ms': round(total / requests * 1000, 2),
+                'max_ms': round(longest * 1000, 2),
+                'total_ms': round(total * 1000, 2)
+            }
+        return result
+
+
+stage_stats = StageStats()
+
+
+def timed(name, totals=None):
+    """
+    Time a stage of the current request, e.g. `with timed('pdf'): ...`.
+    Repeated stages (loop iterations, CSV rows) add up under one name.
+    With a totals dict the seconds are also added there, even when
+    Server-Timing is off (e.g. for a batch summary log record).
+    """
+    if totals is None and (not _enabled or not has_request_context()):
+        return _NOOP
+    return _Stage(name, totals)
+
+
+def init_stage_timing(app):
+    """
+    Time request stages (debug mode or SERVER_TIMING=True).
+    Stages are sent as a Server-Timing header, together with the request
+    total, and added to stage_stats. Safe to call again (e.g. after turning
+    debug on); hooks are added once.
+    """
+    global _enabled
+    if app.extensions.get('stage_timing'):
+        return True
+    if not (app.debug or app.config.get('SERVER_TIMING')):
+        return False
+    app.extensions['stage_timing'] = True
+    _enabled = True
+
+    @app.before_request
+    def start_stage_timing():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def report_stage_timing(response):
+        timings = g.pop('stage_timings', None)
+        if timings:
+            total = time.perf_counter() - g.request_started
+            metrics = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+            metrics.append(f"total;dur={total * 1000:.1f}")
+            response.headers['Server-Timing'] = ', '.join(metrics)
+            stage_stats.record(request.endpoint, timings)
+        return response
+
+    return True
@@ -0,0 +1,169 @@
+# utils/stats.py
+
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models.certificate_model import Certificate
+from models.certificate_subject_model import CertificateSubject
+from models.daily_stats_model import DailyStats
+from models.verification_log_model import VerificationLog
+
+COUNTER_COLUMNS = (
+    'certificates_issued',
+    'verifications_total',
+    'verifications_valid',
+    'verifications_invalid',
+    'verifications_tampered'
+)
+
+STATUS_COLUMNS = {
+    'Valid': 'verifications_valid',
+    'Invalid': 'verifications_invalid',
+    'Tampered': 'verifications_tampered'
+}
+
+
+def to_day(value):
+    """Normalize a datetime, date or ISO string (SQLite date()) to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def last_months(count, today=None):
+    """Return the last count (year, month) pairs, oldest first, ending with today's month"""
+    today = today or date.today()
+    year, month = today.year, today.month
+    months = []
+    for _ in range(count):
+        months.append((year, month))
+        month -= 1
+        if month == 0:
+            month = 12
+            year -= 1
+    return list(reversed(months))
+
+
+def increment_daily_stats(day, **counts):
+    """
+    Add counts to a day's row in the current session without committing,
+    so the increment lands in the same transaction as the rows it counts.
+    """
+    counts = {name: amount for name, amount in counts.items() if amount}
+    if not counts:
+        return
+
+    values = {name: getattr(DailyStats, name) + amount for name, amount in counts.items()}
+    result = db.session.execute(update(DailyStats).where(DailyStats.day == day).values(**values))
+    if result.rowcount:
+        return
+
+    try:
+        with db.session.begin_nested():
+            row = {name: 0 for name in COUNTER_COLUMNS}
+            row.update(counts)
+            db.session.add(DailyStats(day=day, **row))
+    except IntegrityError:
+        # Another transaction created the day's row first
+        db.session.execute(update(DailyStats).where(DailyStats.day == day).values(**values))
+
+
+def record_issuance(issue_date, count=1):
+    """Count issued certificates against their issue date"""
+    increment_daily_stats(to_day(issue_date), certificates_issued=count)
+
+
+def record_verifications(rows):
+    """Count verification log rows (dicts with verified_at and status) per day and status"""
+    per_day = defaultdict(lambda: defaultdict(int))
+    for row in rows:
+        day = to_day(row.get('verified_at') or datetime.utcnow())
+        per_day[day]['verifications_total'] += 1
+        column = STATUS_COLUMNS.get(row.get('status'))
+        if column:
+            per_day[day][column] += 1
+
+    for day, counts in per_day.items():
+        increment_daily_stats(day, **counts)
+
+
+def rebuild_daily_stats():
+    """Recompute every daily_stats row from certificates and verification_logs"""
+    per_day = defaultdict(lambda: {name: 0 for name in COUNTER_COLUMNS})
+
+    issued = db.session.query(func.date(Certificate.issue_date), func.count(Certificate.id)) \
+        .group_by(func.date(Certificate.issue_date)).all()
+    for day, count in issued:
+        per_day[to_day(day)]['certificates_issued'] += count
+
+    verified = db.session.query(func.date(VerificationLog.verified_at), VerificationLog.status,
+                                func.count(VerificationLog.id)) \
+        .group_by(func.date(VerificationLog.verified_at), VerificationLog.status).all()
+    for day, status, count in verified:
+        per_day[to_day(day)]['verifications_total'] += count
+        column = STATUS_COLUMNS.get(status)
+        if column:
+            per_day[to_day(day)][column] += count
+
+    db.session.query(DailyStats).delete()
+    db.session.add_all(DailyStats(day=day, **counts) for day, counts in per_day.items())
+    db.session.commit()
+    return len(per_day)
+
+
+def get_dashboard_stats(months=6):
+    """
+    Totals and per-month issuance for the admin dashboard, read from
+    daily_stats only (two queries on one row per day, independent of
+    how many certificates or logs exist).
+    """
+    month_keys = last_months(months)
+    start_day = date(month_keys[0][0], month_keys[0][1], 1)
+
+    totals = db.session.query(
+        func.coalesce(func.sum(DailyStats.certificates_issued), 0),
+        func.coalesce(func.sum(DailyStats.verifications_total), 0),
+        func.coalesce(func.sum(DailyStats.verifications_tampered), 0)
+    ).one()
+
+    per_month = dict.fromkeys(month_keys, 0)
+    rows = db.session.query(DailyStats.day, DailyStats.certificates_issued) \
+        .filter(DailyStats.day >= start_day).all()
+    for day, count in rows:
+        key = (day.year, day.month)
+        if key in per_month:
+            per_month[key] += count
+
+    return {
+        'total_certificates': totals[0],
+        'total_verifications': totals[1],
+        'total_tampered': totals[2],
+        'chart_labels': [date(year, month, 1).strftime('%b %Y') for year, month in month_keys],
+        'chart_data': [per_month[key] for key in month_keys]
+    }
+
+
+def get_grade_distribution(code=None, course_name=None):
+    """
+    Grade counts per subject code from certificate_subjects:
+    {code: {grade: count}}. Optionally limited to one subject code and/or course.
+    """
+    query = db.session.query(CertificateSubject.code, CertificateSubject.grade, func.count(CertificateSubject.id))
+    if code:
+        query = query.filter(CertificateSubject.code == code)
+    if course_name:
+        query = query.join(Certificate, Certificate.id == CertificateSubject.certificate_id) \
+            .filter(Certificate.course_name == course_name)
+    rows = query.group_by(CertificateSubject.code, CertificateSubject.grade) \
+        .order_by(CertificateSubject.code, CertificateSubject.grade).all()
+
+    distribution = defaultdict(dict)
+    for subject_code, grade, count in rows:
+        distribution[subject_code][grade or ''] = count
+    return dict(distribution)
@@ -0,0 +1,119 @@
+# utils/structured_log.py
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from utils.metrics import QUEUE_DEPTH, QUEUE_DROPPED
+
+QUEUE_NAME = 'structured_logs'  # queue label on background_queue_depth / background_queue_dropped
+
+# LogRecord attributes; anything else on a record came from `extra=` and is output as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, pid and any extra fields"""
+    def format(self, record):
+        entry = {
+            'time': datetime.utcfromtimestamp(record.created).isoformat(timespec='milliseconds') + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _DepthReportingListener(QueueListener):
+    """QueueListener that updates the queue depth gauge as it drains the queue"""
+    def handle(self, record):
+        super().handle(record)
+        QUEUE_DEPTH.labels(QUEUE_NAME).set(self.queue.qsize())
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Logging handler that only puts records on a bounded queue; a listener
+    thread formats and writes them. When the queue is full the record is
+    dropped (and counted) rather than blocking the request. Queue depth and
+    drops are exported as the 'structured_logs' queue metrics. The listener is
+    started per process, so it is restarted after a gunicorn fork.
+    """
+    def __init__(self, stream_handler, max_queue=10000):
+        super().__init__(queue.Queue(maxsize=max_queue))
+        self.stream_handler = stream_handler
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            QUEUE_DROPPED.labels(QUEUE_NAME).inc()
+            return
+        QUEUE_DEPTH.labels(QUEUE_NAME).set(self.queue.qsize())
+
+    def prepare(self, record):
+        """Resolve the message and traceback now; the record is formatted on the listener thread"""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self.stream_handler.formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def stop(self):
+        """Write out whatever is still queued (at interpreter shutdown)"""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+
+    def _start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # A queue inherited across fork may hold a lock taken by the parent's listener
+            self.queue = queue.Queue(maxsize=self.max_queue)
+            self._listener = _DepthReportingListener(self.queue, self.stream_handler, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+
+def init_logging(app):
+    """
+    Send every logger's records through one JSON queue handler on the root
+    logger at LOG_LEVEL (INFO by default; DEBUG adds per-certificate detail).
+    Safe to call more than once.
+    """
+    root = logging.getLogger()
+    root.setLevel(app.config.get('LOG_LEVEL', 'INFO').upper())
+    if any(isinstance(handler, NonBlockingQueueHandler) for handler in root.handlers):
+        return False
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    root.addHandler(NonBlockingQueueHandler(stream_handler, max_queue=app.config.get('LOG_QUEUE_SIZE', 10000)))
+    return True
@@ -0,0 +1,119 @@
+# utils/warmup.py
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from database import db
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """
+    Runs start-up work (load the ledger, build its lookup indexes, prime the
+    caches) on a background thread, so the process answers liveness probes
+    while it warms up. Stages run in order; each is called as
+    func(progress) inside an app context and may report progress(done, total).
+    The process is ready once every stage has finished. A failed run is
+    retried by the next start() after retry_interval seconds.
+    """
+    def __init__(self, stages=(), app=None):
+        self.app = None
+        self.stages = list(stages)  # (name, func)
+        self.retry_interval = 30.0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._started = None  # (wall clock, monotonic) of the current run
+        self._finished = None  # monotonic time the current run ended
+        self._state = 'pending'
+        self._stage_status = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read warm-up settings from the app config"""
+        self.app = app
+        self.retry_interval = app.config.get('WARMUP_RETRY_INTERVAL', self.retry_interval)
+
+    @property
+    def ready(self):
+        return self._state == 'ready' and self._pid == os.getpid()
+
+    def start(self):
+        """
+        Start warming up unless a run is in progress or has succeeded in this
+        process (a run inherited across a fork does not count); returns True
+        if a run was started.
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                if self._state in ('warming', 'ready'):
+                    return False
+                if self._state == 'failed' and time.monotonic() - self._finished < self.retry_interval:
+                    return False
+            self._pid = os.getpid()
+            self._state = 'warming'
+            self._started = (datetime.utcnow(), time.monotonic())
+            self._finished = None
+            self._stage_status = {name: {'status': 'pending'} for name, _ in self.stages}
+            self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+            self._thread.start()
+            return True
+
+    def wait(self, timeout=None):
+        """Block until the current run ends; returns ready"""
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+        return self.ready
+
+    def status(self):
+        """Readiness report: overall state, elapsed time and per-stage progress and timings"""
+        if self._pid != os.getpid():
+            return {'ready': False, 'state': 'pending', 'stages': {}}
+        started_at, started = self._started
+        elapsed = (self._finished or time.monotonic()) - started
+        return {
+            'ready': self.ready,
+            'state': self._state,
+            'started_at': started_at.isoformat() + 'Z',
+            'elapsed_ms': round(elapsed * 1000, 1),
+            'stages': {name: dict(self._stage_status[name]) for name, _ in self.stages}
+        }
+
+    def _run(self):
+        """Warm-up thread: run each stage in order, stopping at the first failure"""
+        with self.app.app_context():
+            for name, func in self.stages:
+                status = self._stage_status[name]
+                status['status'] = 'running'
+                stage_started = time.monotonic()
+
+                def progress(done, total, status=status):
+                    status['done'] = done
+                    status['total'] = total
+                    status['percent'] = round(100.0 * done / total, 1) if total else 100.0
+
+                try:
+                    func(progress)
+                except Exception as e:
+                    db.session.rollback()
+                    status.update(status='failed', error=str(e),
+                                  duration_ms=round((time.monotonic() - stage_started) * 1000, 1))
+                    self._finish('failed')
+                    logger.exception("Warm-up stage '%s' failed", name, extra={'event': 'warmup.failed', 'stage': name})
+                    return
+                finally:
+                    db.session.remove()
+                status.update(status='done', duration_ms=round((time.monotonic() - stage_started) * 1000, 1))
+        self._finish('ready')
+        logger.info('Warm-up finished', extra={
+            'event': 'warmup.done', 'elapsed_ms': round((self._finished - self._started[1]) * 1000, 1),
+            'stages_ms': {name: status.get('duration_ms') for name, status in self._stage_status.items()}})
+
+    def _finish(self, state):
+        self._finished = time.monotonic()
+        self._state = state